@@ -1,29 +1,62 @@
 import sys
+import os
+import time
+if any(flag in sys.argv for flag in ("--headless", "--bench", "--sweep", "--pack-atlas")): os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # 창 없이 실행
+BOOT_START = time.perf_counter() # 첫 화면까지 걸린 시간 측정용
 import subprocess
+import importlib
+import importlib.util
 # --------------- 패키지 설치 ---------------
-for pkg in ["pygame", "numpy", "requests"]:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg])
+REQUIRED_PACKAGES = ["pygame", "numpy", "requests"]
+missing_packages = [pkg for pkg in REQUIRED_PACKAGES if importlib.util.find_spec(pkg) is None] # 프로세스 안 띄우고 확인
+if missing_packages: # 없는 것만 한 번에 설치
+    subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+    importlib.invalidate_caches()
+
+class LazyModule: # 처음 쓸 때 import
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attr):
+        if self.module is None: self.module = importlib.import_module(self.name)
+        return getattr(self.module, attr)
 
 
 
 import pygame
 import random
-import time
 import math
-import numpy as np
-from collections import deque
-import requests
+import re
+from collections import deque, OrderedDict
 from io import BytesIO
+import json
+import csv
+import atexit
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import itertools
+import struct
+import mmap
+np = LazyModule("numpy") # generate_maze에서만 사용
+requests = LazyModule("requests") # 캐시에 없는 에셋 받을 때만 사용
 
 
 
 # --------------- 게임 세팅 ---------------
 pygame.init()
 
+def arg_value(name, default=None): # "--name 값" 형태 인자
+    if name in sys.argv and sys.argv.index(name) + 1 < len(sys.argv): return sys.argv[sys.argv.index(name) + 1]
+    return default
+
 WINDOW_W, WINDOW_H = 960, 540
 FPS = 60
+IDLE_FPS = 10 # 안 움직이는 화면(타이틀, 결과 등)에서 최대 프레임
 TILE = 24 # 미로 타일 크기
+MOVE_REPEAT = 0.08 # 미로에서 방향키를 누르고 있을 때 한 칸 이동 간격(초)
 RAND_MIN, RAND_MAX = 1, 5
+BALANCE = {'cat_speed': 1.0, 'spawn': 1.0, 'time': 1.0} # 난이도 배율 (고양이 속도, 장애물 생성 간격, 제한 시간)
 
 WHITE = (255,255,255)
 BLACK = (0,0,0)
@@ -67,8 +100,17 @@ EMOTIONS = {
 FONT = pygame.font.SysFont("malgungothic", 12)
 
 pygame.display.set_caption("고영희 키우기")
-screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
+screen = None
+if arg_value("--backend") == "texture": # 창은 TextureBackend가 따로 만들고, 이 창은 convert()용으로 숨겨 둠
+    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H), pygame.HIDDEN)
+elif "--vsync" in sys.argv: # 모니터 주사율에 맞춰 그리기 (지원 안 하면 그냥 창)
+    try: screen = pygame.display.set_mode((WINDOW_W, WINDOW_H), pygame.SCALED, vsync=1)
+    except pygame.error: pass
+if screen is None: screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
 clock = pygame.time.Clock()
+pygame.event.set_blocked(None) # 쓰는 이벤트만 큐에 들어오게 (마우스 이동 등은 안 쌓임)
+pygame.event.set_allowed([pygame.QUIT, pygame.WINDOWCLOSE, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                          pygame.WINDOWEXPOSED, pygame.WINDOWFOCUSLOST])
 dt = clock.tick(FPS) / 1000.0
 
 class GameState:
@@ -82,69 +124,923 @@ class GameState:
 gs = GameState()
 
 class Entity:
+    __slots__ = ('x', 'y', 'size', 'speed', 'prev_x', 'prev_y', 'box')
+
     def __init__(self, x, y, size):
+        self.box = pygame.Rect(0, 0, size, size) # rect()가 매번 새로 만들지 않고 이것을 고쳐서 돌려줌
+        self.reset(x, y, size)
+
+    def reset(self, x, y, size): # 풀에서 다시 꺼낼 때
         self.x = x
         self.y = y
         self.size = size
         self.speed = 140
+        self.prev_x = x # 지난 업데이트 위치 (그릴 때 보간용)
+        self.prev_y = y
+        return self
+
+    def remember(self): # 업데이트 직전에 호출
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-    def rect(self): # 충돌 감지용 사각형
-        return pygame.Rect(int(self.x), int(self.y), self.size, self.size)
+    def lerp(self, alpha): # 지난 위치와 현재 위치 사이
+        return int(self.prev_x + (self.x - self.prev_x) * alpha), int(self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def rect(self): # 충돌 감지용 사각형 (같은 객체를 제자리에서 갱신하므로 보관하려면 copy())
+        self.box.update(int(self.x), int(self.y), self.size, self.size)
+        return self.box
+
+class EntityPool: # 미션마다 Entity를 새로 만들지 않고 재사용
+    def __init__(self):
+        self.free = []
+        self.used = []
+
+    def acquire(self, x, y, size):
+        entity = self.free.pop().reset(x, y, size) if self.free else Entity(x, y, size)
+        self.used.append(entity)
+        return entity
+
+    def release(self, entity):
+        self.used.remove(entity)
+        self.free.append(entity)
+
+    def release_all(self): # 미션 시작할 때 지난 미션 것을 한꺼번에 돌려받음
+        self.free += self.used
+        self.used.clear()
+entities = EntityPool()
+
+
+
+# --------------- 에셋 로딩 ---------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.path.join(BASE_DIR, "src") # 저장소에 같이 들어있는 이미지
+ASSET_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "goyounghee") # 내용 해시로 저장하는 캐시
+ASSET_URL = "https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/"
+ASSET_NAMES = [
+    "cat.png", "cat_sleeping.png",
+    "player_front_white.png", "player_left_white.png", "player_right_white.png",
+    "player_front_black.png", "player_left_black.png", "player_right_black.png",
+]
+asset_report = [] # (이름, 출처, 걸린 시간 ms)
+
+def cache_index_path():
+    return os.path.join(ASSET_CACHE_DIR, "index.json")
+
+def read_cache_index():
+    try:
+        with open(cache_index_path(), encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def cache_lookup(name, index):
+    digest = index.get(name)
+    if digest is None: return None
+    try:
+        with open(os.path.join(ASSET_CACHE_DIR, digest), "rb") as f: blob = f.read()
+    except OSError: return None
+    if hashlib.sha256(blob).hexdigest() != digest: return None # 깨진 파일은 무시
+    return blob
+
+def cache_store(name, blob, index):
+    digest = hashlib.sha256(blob).hexdigest()
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(ASSET_CACHE_DIR, digest), "wb") as f: f.write(blob)
+        index[name] = digest
+        with open(cache_index_path(), "w", encoding="utf-8") as f: json.dump(index, f)
+    except OSError: pass # 캐시는 없어도 게임은 돌아가야 함
+
+def fetch_remote(name):
+    t = time.perf_counter()
+    response = requests.get(ASSET_URL + name, timeout=5)
+    response.raise_for_status()
+    return response.content, (time.perf_counter() - t) * 1000
+
+def load_assets(names):
+    # src/ -> 디스크 캐시 -> (없을 때만) 원격 순서로 찾고, 원격은 한 번에 병렬로 받음
+    blobs = {}
+    missing = []
+    index = read_cache_index()
+    for name in names:
+        t = time.perf_counter()
+        path = os.path.join(ASSET_DIR, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f: blobs[name] = f.read()
+            source = "local"
+        else:
+            blob = cache_lookup(name, index)
+            if blob is None: missing.append(name); continue
+            blobs[name] = blob
+            source = "cache"
+        asset_report.append((name, source, (time.perf_counter() - t) * 1000))
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+            for name, (blob, ms) in zip(missing, ex.map(fetch_remote, missing)):
+                blobs[name] = blob
+                cache_store(name, blob, index)
+                asset_report.append((name, "remote", ms))
+    return {name: pygame.image.load(BytesIO(blobs[name]), name) for name in names}
+
+def print_asset_report(total_ms):
+    for name, source, ms in asset_report:
+        print(f"[asset] {name:<24} {source:<6} {ms:7.2f} ms")
+    print(f"[asset] {len(asset_report)}개 로딩 완료: {total_ms:.2f} ms")
+
+ATLAS_IMAGE = os.path.join(ASSET_DIR, "atlas.png") # --pack-atlas로 만든 이미지 하나 + 위치 목록
+ATLAS_INDEX = os.path.join(ASSET_DIR, "atlas.idx")
+ATLAS_MAGIC = b"GYHA"
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct("<4sHH") # magic, 버전, 항목 수
+ATLAS_ENTRY = struct.Struct("<24sHBxHHHH") # 이름, 크기, 뒤집기, x, y, w, h
+ATLAS_SIZES = sorted({PLAYER_SIZE, CAT_SIZE, 64}) # 게임에서 쓰는 크기 (64: 타이틀/엔딩 고양이)
+
+def pack_atlas(width=256): # 모든 스프라이트를 크기/뒤집기별로 미리 만들어 한 장에 붙임 (한 줄씩 채우는 방식)
+    sources = load_assets(ASSET_NAMES)
+    variants = []
+    for name in ASSET_NAMES:
+        for size in ATLAS_SIZES:
+            for flip in (False, True):
+                surf = pygame.transform.scale(sources[name], (size, size)) # SpriteCache와 같은 순서로 변환
+                if flip: surf = pygame.transform.flip(surf, True, False)
+                variants.append((name[:-4], size, flip, surf))
+    variants.sort(key=lambda v: -v[1])
+    entries = []
+    x = y = row_h = 0
+    for name, size, flip, surf in variants:
+        if x + size > width: x = 0; y += row_h; row_h = 0
+        entries.append((name, size, flip, x, y, surf))
+        x += size; row_h = max(row_h, size)
+    atlas = pygame.Surface((width, y + row_h), pygame.SRCALPHA)
+    with open(ATLAS_INDEX, "wb") as f:
+        f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(entries)))
+        for name, size, flip, x, y, surf in entries:
+            atlas.blit(surf, (x, y))
+            f.write(ATLAS_ENTRY.pack(name.encode(), size, flip, x, y, size, size))
+    pygame.image.save(atlas, ATLAS_IMAGE)
+    print(f"[atlas] {len(entries)}개 -> {ATLAS_IMAGE} ({atlas.get_width()}x{atlas.get_height()}), {ATLAS_INDEX}")
+
+def load_atlas(): # 아틀라스가 있으면 이미지 한 장만 읽음, 없으면 None
+    if not (os.path.exists(ATLAS_IMAGE) and os.path.exists(ATLAS_INDEX)): return None
+    t = time.perf_counter()
+    with open(ATLAS_INDEX, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm: # 목록은 복사 없이 바로 읽음
+        magic, version, count = ATLAS_HEADER.unpack_from(mm)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION: return None
+        regions = {}
+        for i in range(count):
+            name, size, flip, x, y, w, h = ATLAS_ENTRY.unpack_from(mm, ATLAS_HEADER.size + i * ATLAS_ENTRY.size)
+            regions[(name.rstrip(b"\0").decode(), size, bool(flip))] = pygame.Rect(x, y, w, h)
+    surface = pygame.image.load(ATLAS_IMAGE).convert_alpha()
+    asset_report.append(("atlas.png", "local", (time.perf_counter() - t) * 1000))
+    return surface, regions
+
+asset_start = time.perf_counter()
+atlas = None if "--pack-atlas" in sys.argv else load_atlas()
+images = {} if atlas else load_assets(ASSET_NAMES) # 아틀라스에 없는 크기가 필요하면 그때 개별 파일을 읽음
+print_asset_report((time.perf_counter() - asset_start) * 1000)
+first_frame_ms = None
+
+def mark_first_frame(): # 첫 flip 직후에 호출
+    global first_frame_ms
+    if first_frame_ms is not None: return
+    first_frame_ms = (time.perf_counter() - BOOT_START) * 1000
+    print(f"[boot] 첫 프레임까지: {first_frame_ms:.2f} ms")
+    if "--ttff" in sys.argv: # CI용: 측정값만 출력하고 종료
+        print(json.dumps({"time_to_first_frame_ms": round(first_frame_ms, 3)}))
+        pygame.quit(); sys.exit()
 
 
 
 # --------------- 그리기 함수 ---------------
-def load_image(image_url):
-    response = requests.get(image_url)
-    return BytesIO(response.content)
-cat_image = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/cat.png"))
-cat_sleeping_image = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/cat_sleeping.png"))
-player_front_white = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_front_white.png"))
-player_left_white = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_left_white.png"))
-player_right_white = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_right_white.png"))
-player_front_black = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_front_black.png"))
-player_left_black = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_left_black.png"))
-player_right_black = pygame.image.load(load_image("https://raw.githubusercontent.com/rkdwd/PYTHON_SUHANG/master/src/player_right_black.png"))
+class SpriteCache: # 크기 조절 + 뒤집기 + convert_alpha 끝낸 이미지를 보관 (LRU), 아틀라스에 있으면 그 영역을 씀
+    def __init__(self, max_items=64):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, size, flip=False): # (이미지, 영역) - 영역이 None이면 이미지 전체
+        key = (name, size, flip)
+        item = self.items.get(key)
+        if item is not None:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return item
+        self.misses += 1
+        if atlas and key in atlas[1]: item = (atlas[0], atlas[1][key])
+        else:
+            if name + ".png" not in images: images.update(load_assets([name + ".png"]))
+            surf = pygame.transform.scale(images[name + ".png"], (size, size))
+            if flip: surf = pygame.transform.flip(surf, True, False)
+            item = (surf.convert_alpha(), None) # 화면 픽셀 형식으로 바꿔두면 blit이 빠름
+        self.items[key] = item
+        if len(self.items) > self.max_items: self.items.popitem(last=False) # 가장 오래 안 쓴 것 제거
+        return item
+sprite_cache = SpriteCache()
+
+gpu = None # --backend texture일 때 TextureBackend (screen에 그리는 것만 텍스처로 보냄)
+
+def blit_to(surf, image, dest, area=None):
+    if gpu and surf is screen: return gpu.blit(image, dest, area)
+    return surf.blit(image, dest, area)
+
+def fill_to(surf, color, rect):
+    if gpu and surf is screen: return gpu.fill(color, rect)
+    return pygame.draw.rect(surf, color, rect)
+
+def circle_to(surf, color, center, radius):
+    if gpu and surf is screen: return gpu.circle(color, center, radius)
+    return pygame.draw.circle(surf, color, center, radius)
 
 def draw_cat(surf, x, y, size, flip=False, sleeping=False):
-    if sleeping: image_to_use = cat_sleeping_image
-    else: image_to_use = cat_image
-    scaled_cat = pygame.transform.scale(image_to_use, (size, size))
-    if flip: scaled_cat = pygame.transform.flip(scaled_cat, True, False)
-    surf.blit(scaled_cat, (x, y))
+    name = "cat_sleeping" if sleeping else "cat"
+    source, area = sprite_cache.get(name, size, flip)
+    return blit_to(surf, source, (x, y), area)
 
 def draw_player(surf, x, y, size, direction='front', use_white=True):
-    image = None
-    if use_white:
-        if direction == 'front': image = player_front_white
-        elif direction == 'left': image = player_left_white
-        elif direction == 'right': image = player_right_white
-    else:
-        if direction == 'front': image = player_front_black
-        elif direction == 'left': image = player_left_black
-        elif direction == 'right': image = player_right_black
-    scaled_player = pygame.transform.scale(image, (size, size))
-    surf.blit(scaled_player, (int(x), int(y)))
+    name = f"player_{direction}_{'white' if use_white else 'black'}"
+    source, area = sprite_cache.get(name, size)
+    return blit_to(surf, source, (int(x), int(y)), area)
+
+TEXT_RUN = re.compile(r"\d|\D+")
+
+class TextCache: # FONT.render 결과를 보관 (메모리 상한 넘으면 오래된 것부터 제거)
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, color, antialias=True):
+        key = (text, color, antialias)
+        surf = self.items.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = FONT.render(text, antialias, color)
+        self.items[key] = surf
+        self.used_bytes += surf.get_width() * surf.get_height() * surf.get_bytesize()
+        while self.used_bytes > self.max_bytes and len(self.items) > 1:
+            _, old = self.items.popitem(last=False)
+            self.used_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return surf
+
+    def runs(self, text, color):
+        # 숫자는 한 글자씩, 나머지는 덩어리로 나눠서 캐시 (매 프레임 바뀌는 문자열용)
+        return [self.get(run, color) for run in TEXT_RUN.findall(text)]
+text_cache = TextCache()
 
 def draw_text_center(surf, text, y, color=WHITE):
-    r = FONT.render(text, True, color)
+    r = text_cache.get(text, color)
     rect = r.get_rect(center=(WINDOW_W//2, y))
-    surf.blit(r, rect)
+    return blit_to(surf, r, rect)
 
 def draw_text(surf, text, x, y, color=WHITE):
-    surf.blit(FONT.render(text, True, color), (x,y))
+    return blit_to(surf, text_cache.get(text, color), (x,y))
+
+def draw_text_dynamic(surf, text, x, y, color=WHITE): # 남은시간/점수처럼 자주 바뀌는 문자열
+    area = pygame.Rect(x, y, 0, 0)
+    for r in text_cache.runs(text, color):
+        area.union_ip(blit_to(surf, r, (x, y)))
+        x += r.get_width()
+    return area
 
 def draw_timer_bar(elapsed, total):
-    pygame.draw.rect(screen, TIMER_TIME, (20, 20, WINDOW_W-40, 16))
-    pygame.draw.rect(screen, TIMER_BG, (20, 20, int((1 - elapsed/total) * (WINDOW_W - 40)), 16))
+    fill_to(screen, TIMER_TIME, (20, 20, WINDOW_W-40, 16))
+    fill_to(screen, TIMER_BG, (20, 20, int((1 - elapsed/total) * (WINDOW_W - 40)), 16))
+    return pygame.Rect(20, 20, WINDOW_W-40, 16)
+
+def make_background(color): # 화면마다 안 바뀌는 부분을 그려둘 배경
+    layer = pygame.Surface((WINDOW_W, WINDOW_H)).convert()
+    layer.fill(color)
+    return layer
+
+class DirtyRenderer: # 바뀐 영역만 화면에 반영하고, 너무 많이 바뀌면 전체 flip
+    def __init__(self, full_ratio=0.4):
+        self.full_ratio = full_ratio
+        self.background = None
+        self.prev = [] # 지난 프레임에 그린 스프라이트 영역 (이번 프레임에 지워야 함)
+        self.rects = [] # 이번 프레임에 그린 스프라이트 영역
+        self.marked = [] # 지울 필요는 없지만 화면에 반영해야 하는 영역 (타이머, 글자)
+        self.hud = {} # (x, y) -> (글자, 영역)
+        self.full = True
+
+    def set_background(self, background): # 화면(미션)이 바뀔 때 한 번
+        self.background = background
+        screen.blit(background, (0, 0))
+        self.prev = []; self.rects = []; self.marked = []; self.hud = {}
+        self.full = True
+
+    def begin(self):
+        for rect in self.prev: screen.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        self.rects.append(rect)
+        return rect
+
+    def mark(self, rect):
+        self.marked.append(rect)
+        return rect
+
+    def text(self, text, x, y, color=WHITE): # 글자가 바뀌었거나 지워졌을 때만 다시 그림
+        last = self.hud.get((x, y))
+        if last is not None:
+            if last[0] == text and last[1].collidelist(self.prev) == -1: return last[1]
+            screen.blit(self.background, last[1], last[1])
+            self.marked.append(last[1])
+        rect = draw_text_dynamic(screen, text, x, y, color)
+        self.hud[(x, y)] = (text, rect)
+        return self.mark(rect)
+
+    def present(self):
+        if profiler.show_overlay: profiler.draw_overlay(self)
+        rects = self.prev + self.rects + self.marked
+        if self.full or sum(r.w * r.h for r in rects) > self.full_ratio * WINDOW_W * WINDOW_H: pygame.display.flip()
+        else: pygame.display.update(rects)
+        input_buffer.presented()
+        self.prev = self.rects
+        self.rects = []; self.marked = []
+        self.full = False
+        profiler.mark('present')
+        if capture:
+            capture.grab()
+            profiler.mark('capture')
+
+class TextureBackend: # pygame._sdl2.video로 그리기: 이미지는 한 번만 텍스처로 올리고, 프레임마다 명령을 모았다가 한꺼번에 그림
+    def __init__(self, accelerated=-1):
+        from pygame._sdl2 import video
+        self.video = video
+        self.accelerated = accelerated # -1: 가능하면 GPU, 0: 소프트웨어 (창 없는 테스트용)
+        self.window = video.Window(pygame.display.get_caption()[0], size=(WINDOW_W, WINDOW_H)) # set_mode 창에는 Renderer를 붙일 수 없음
+        self.renderer = video.Renderer(self.window, accelerated=accelerated, vsync="--vsync" in sys.argv)
+        self.textures = OrderedDict() # id(surface) -> (surface, 텍스처), surface를 같이 들고 있어야 id가 재사용되지 않음
+        self.circles = {} # (색, 반지름) -> 텍스처
+        self.background = None
+        self.commands = [] # ('fill', 색, [영역...]) 또는 ('copy', 텍스처, 원본 영역, 화면 영역)
+        self.last = [] # 마지막으로 그린 명령 (새 명령 없이 present하면 다시 그림)
+
+    def texture(self, surf):
+        item = self.textures.get(id(surf))
+        if item is not None and item[0] is surf:
+            self.textures.move_to_end(id(surf))
+            return item[1]
+        tex = self.video.Texture.from_surface(self.renderer, surf)
+        self.textures[id(surf)] = (surf, tex)
+        if len(self.textures) > 512: self.textures.popitem(last=False)
+        return tex
+
+    def set_background(self, surf): # 화면이 바뀔 때 한 번만 올림
+        self.background = self.video.Texture.from_surface(self.renderer, surf)
+        self.last = []
+
+    def blit(self, surf, dest, area=None):
+        rect = pygame.Rect(dest[0], dest[1], *(area or surf.get_rect()).size) # dest는 (x, y) 또는 Rect
+        self.commands.append(('copy', self.texture(surf), area, rect))
+        return rect
+
+    def fill(self, color, rect):
+        rect = pygame.Rect(rect)
+        last = self.commands[-1] if self.commands else None
+        if last and last[0] == 'fill' and last[1] == color: last[2].append(rect) # 같은 색이 이어지면 묶음
+        else: self.commands.append(('fill', color, [rect]))
+        return rect
+
+    def circle(self, color, center, radius):
+        tex = self.circles.get((color, radius))
+        if tex is None:
+            surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            tex = self.circles[(color, radius)] = self.video.Texture.from_surface(self.renderer, surf)
+        rect = pygame.Rect(center[0] - radius, center[1] - radius, radius*2, radius*2)
+        self.commands.append(('copy', tex, None, rect))
+        return rect
+
+    def present(self):
+        r = self.renderer
+        r.draw_color = (*BLACK, 255)
+        r.clear()
+        if self.background: self.background.draw()
+        if self.commands: self.last = self.commands; self.commands = [] # hold()처럼 새로 그린 게 없으면 이전 화면 유지
+        for cmd in self.last:
+            if cmd[0] == 'copy': cmd[1].draw(cmd[2], cmd[3])
+            else:
+                r.draw_color = (*cmd[1], 255)
+                for rect in cmd[2]: r.fill_rect(rect)
+        r.present()
+
+class TextureRenderer(DirtyRenderer): # DirtyRenderer와 같은 사용법, 대신 매 프레임 전체를 텍스처로 다시 그림
+    def set_background(self, background):
+        gpu.set_background(background)
+        self.prev = []; self.rects = []; self.marked = []
+        self.full = True
+
+    def begin(self): pass # 배경은 present에서 통째로 그림
+
+    def text(self, text, x, y, color=WHITE): # 매 프레임 지워지므로 항상 그림
+        return self.mark(draw_text_dynamic(screen, text, x, y, color))
+
+    def present(self):
+        if profiler.show_overlay: profiler.draw_overlay(self)
+        gpu.present()
+        input_buffer.presented()
+        self.rects = []; self.marked = []
+        self.full = False
+        profiler.mark('present')
+
+if arg_value("--backend") == "texture": gpu = TextureBackend(accelerated=0 if "--software" in sys.argv else -1)
+renderer = TextureRenderer() if gpu else DirtyRenderer()
+
+
+
+# --------------- 프로파일러 ---------------
+PROFILE_PHASES = ['events', 'tick', 'movement', 'spawn', 'collision', 'sprites', 'text', 'present', 'capture']
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+
+class FrameProfiler: # 프레임을 단계별로 나눠서 시간 측정 (꺼져 있으면 바로 return)
+    def __init__(self, window=600):
+        self.enabled = False
+        self.show_overlay = False
+        self.scene = "title"
+        self.frames = deque(maxlen=window) # 최근 프레임 시간 (ms), 기다리는 프레임은 뺌
+        self.rows = deque(maxlen=window) # frames와 같은 프레임의 단계별 기록
+        self.trace = [] # 세션 전체: (장면, 프레임 ms, 단계별 ms..., 기다린 프레임 여부)
+        self.current = {}
+        self.frame_start = None
+        self.frame_scene = None
+        self.frame_idle = False
+        self.last = None
+        self.dropped = 0
+        self.overlay_lines = []
+
+    def frame(self, idle=False): # 루프 맨 위에서 호출: 지난 프레임을 기록하고 새 프레임 시작
+        if not self.enabled: return # idle: 이번 프레임은 입력/시간을 기다리는 프레임 (인트로, 결과, hold)
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            total = (now - self.frame_start) * 1000
+            row = (self.frame_scene, total, *[self.current.get(p, 0.0) for p in PROFILE_PHASES], self.frame_idle)
+            self.trace.append(row)
+            if not self.frame_idle: # 일부러 잠든 프레임은 놓친 프레임/백분위에 넣지 않음
+                self.frames.append(total); self.rows.append(row)
+                if total > 1500 / FPS: self.dropped += 1 # 한 프레임 예산의 1.5배를 넘기면 놓친 프레임
+            self.current = {}
+            if self.show_overlay and len(self.trace) % 30 == 0: self.overlay_lines = self.summary_lines()
+        self.frame_start = self.last = now
+        self.frame_scene, self.frame_idle = self.scene, idle
+
+    def mark(self, phase): # 직전 mark 이후 시간을 phase에 더함
+        if not self.enabled or self.last is None: return
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def percentiles(self):
+        if not self.frames: return 0.0, 0.0, 0.0
+        f = sorted(self.frames)
+        pick = lambda q: f[min(len(f) - 1, int(q * len(f)))]
+        return pick(0.50), pick(0.95), pick(0.99)
+
+    def summary_lines(self):
+        p50, p95, p99 = self.percentiles()
+        lines = [f"p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} ms, 놓친 프레임 {self.dropped}"]
+        for k, phase in enumerate(PROFILE_PHASES):
+            avg = sum(row[2 + k] for row in self.rows) / max(1, len(self.rows))
+            lines.append(f"{phase} {avg:.2f} ms")
+        return lines
+
+    def toggle_overlay(self):
+        self.enabled = True
+        self.show_overlay = not self.show_overlay
+        renderer.full = True
+
+    def draw_overlay(self, target): # 오른쪽 위에 작게 표시 (다음 프레임에 지워지도록 add)
+        for i, line in enumerate(self.overlay_lines):
+            target.add(draw_text_dynamic(screen, line, WINDOW_W - 230, 44 + i * 16, TIMER_BG))
+
+    def dump(self): # 세션 기록을 JSON/CSV로 저장
+        if not self.trace: return
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = os.path.join(PROFILE_DIR, time.strftime("session_%Y%m%d_%H%M%S"))
+        p50, p95, p99 = self.percentiles()
+        with open(name + ".json", "w", encoding="utf-8") as f:
+            json.dump({'fps': FPS, 'frames': len(self.trace), 'idle_frames': sum(row[-1] for row in self.trace), 'dropped': self.dropped,
+                       'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'phases': PROFILE_PHASES,
+                       'trace': self.trace}, f, ensure_ascii=False)
+        with open(name + ".csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(['scene', 'frame_ms', *PROFILE_PHASES, 'idle'])
+            for row in self.trace: writer.writerow([row[0], *[f"{v:.4f}" for v in row[1:-1]], int(row[-1])])
+        print(f"[profile] {len(self.trace)}프레임 저장: {name}.json / .csv")
+profiler = FrameProfiler()
+if "--profile" in sys.argv:
+    profiler.enabled = True
+    atexit.register(profiler.dump)
+
+
+
+# --------------- 화면 녹화 ---------------
+CAPTURE_DIR = os.path.join(BASE_DIR, "captures")
+
+class FrameCapture: # 최근 몇 초 화면을 미리 잡아둔 mmap 파일에 돌려가며 복사 (프레임마다 새로 할당 안 함)
+    def __init__(self, seconds=5.0, fps=30, scale=2):
+        self.scale = scale # 2면 가로/세로 절반으로 줄여서 저장
+        self.interval = 1.0 / fps
+        self.slots = int(seconds * fps)
+        self.w, self.h = -(-WINDOW_W // scale), -(-WINDOW_H // scale)
+        size = self.slots * 8 + self.slots * self.w * self.h * 3
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        self.file = open(os.path.join(CAPTURE_DIR, "ring.bin"), "w+b")
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+        self.times = np.frombuffer(self.mm, dtype=np.float64, count=self.slots) # 칸마다 찍은 시각
+        self.frames = np.frombuffer(self.mm, dtype=np.uint8, offset=self.slots * 8).reshape(self.slots, self.w, self.h, 3)
+        self.count = 0
+        self.last = 0.0
+        self.writer = ThreadPoolExecutor(max_workers=1) # PNG 인코딩은 150장이면 0.7초쯤 걸려서 다른 스레드에서
+
+    def grab(self): # present 직후 호출
+        now = time.perf_counter()
+        if now - self.last < self.interval: return
+        self.last = now
+        slot = self.count % self.slots
+        pixels = pygame.surfarray.pixels3d(screen) # 복사 없이 화면 픽셀을 보는 배열 (보는 동안 화면이 잠김)
+        np.copyto(self.frames[slot], pixels[::self.scale, ::self.scale])
+        del pixels
+        self.times[slot] = now
+        self.count += 1
+
+    def dump(self, reason): # 고리 버퍼에 남은 프레임을 오래된 것부터 복사해 두고, 저장은 writer 스레드에서
+        n = min(self.count, self.slots)
+        if n == 0: return
+        folder = os.path.join(CAPTURE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{reason}")
+        order = [i % self.slots for i in range(self.count - n, self.count)]
+        frames, times = self.frames[order], self.times[order] # 인덱스 배열로 꺼내면 복사본이라 계속 grab해도 안 바뀜
+        self.writer.submit(self.save, folder, frames, times - times[0])
+
+    def save(self, folder, frames, times):
+        os.makedirs(folder, exist_ok=True)
+        for i, frame in enumerate(frames):
+            pygame.image.save(pygame.surfarray.make_surface(frame), os.path.join(folder, f"frame_{i:04d}.png"))
+        with open(os.path.join(folder, "frames.json"), "w", encoding="utf-8") as f:
+            json.dump({'scale': self.scale, 'times': [round(float(t), 4) for t in times]}, f)
+        print(f"[capture] {len(frames)}프레임 저장: {folder}")
+
+capture = None
+if "--capture" in sys.argv: # --capture [--capture-seconds 5] [--capture-fps 30] [--capture-scale 2], F9로 저장
+    if arg_value("--backend") == "texture": print("[capture] texture 백엔드에서는 화면 녹화를 쓸 수 없음")
+    else: capture = FrameCapture(float(arg_value("--capture-seconds", 5)), int(arg_value("--capture-fps", 30)), int(arg_value("--capture-scale", 2)))
+
+
+
+# --------------- 장애물 ---------------
+OBSTACLE_TYPES = ['dust', 'fly', 'wind'] # kind 번호 순서
+OBSTACLE_COLORS = [DUST, FLY, WIND]
+
+class ObstaclePool: # 장애물을 numpy 배열로 한꺼번에 관리 (위치/속도/크기/종류를 배열별로)
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32) # 사각형이면 한 변, 원이면 반지름
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+
+    shared_pool = None
+
+    @classmethod
+    def shared(cls): # 미션마다 새 배열을 만들지 않고 하나를 비워서 재사용
+        if cls.shared_pool is None: cls.shared_pool = cls()
+        cls.shared_pool.count = 0
+        return cls.shared_pool
+
+    def arrays(self):
+        return [self.x, self.y, self.vx, self.vy, self.size, self.kind]
+
+    def spawn(self, x, y, vx, vy, size, kind=0):
+        i = self.count
+        if i == len(self.x): # 꽉 차면 두 배로 늘림
+            for name in ['x', 'y', 'vx', 'vy', 'size', 'kind']:
+                old = getattr(self, name)
+                grown = np.zeros(len(old) * 2, dtype=old.dtype)
+                grown[:i] = old
+                setattr(self, name, grown)
+        self.x[i] = x; self.y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.size[i] = size; self.kind[i] = kind
+        self.count += 1
+
+    def update(self, dt):
+        n = self.count
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+
+    def remove(self, mask): # 지울 칸을 뒤쪽의 살아있는 칸으로 채움 (swap-remove)
+        n = self.count
+        dead = np.flatnonzero(mask[:n])
+        if len(dead) == 0: return 0
+        new_n = n - len(dead)
+        holes = dead[dead < new_n]
+        survivors = new_n + np.flatnonzero(~mask[new_n:n])
+        for a in self.arrays(): a[holes] = a[survivors]
+        self.count = new_n
+        return len(dead)
+
+    def cull(self, margin=40): # 화면 밖으로 나간 것 제거
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return self.remove((x < -margin) | (x > WINDOW_W + margin) | (y < -margin) | (y > WINDOW_H + margin))
+
+    def remove_at(self, indices):
+        mask = np.zeros(self.count, dtype=bool)
+        mask[indices] = True
+        return self.remove(mask)
+
+    def rows(self): # 그리기용 (x, y, size, kind)
+        n = self.count
+        return zip(self.x[:n].tolist(), self.y[:n].tolist(), self.size[:n].tolist(), self.kind[:n].tolist())
+
+
+
+# --------------- 충돌 검사 ---------------
+class SpatialHash: # 균일 격자 broadphase: 근처 칸에 있는 것만 정밀 검사
+    def __init__(self, cell=64):
+        self.cell = cell
+        self.cols = WINDOW_W // cell + 3 # 화면 밖 한 칸씩 여유
+        self.rows = WINDOW_H // cell + 3
+        self.count = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.queries = 0
+        self.candidates = 0 # broadphase가 넘겨준 후보 쌍
+        self.hits = 0 # 실제로 겹친 쌍
+
+    def build(self, x, y, size, count, shape='rect'):
+        # shape: 'rect'면 (x, y)가 왼쪽 위인 정사각형, 'circle'이면 (x, y)가 중심이고 size가 반지름
+        self.x, self.y, self.size = x[:count], y[:count], size[:count]
+        self.count = count
+        self.shape = shape
+        self.reach = float(self.size.max()) if count else 0.0
+        cx = np.clip((self.x // self.cell).astype(np.int32) + 1, 0, self.cols - 1)
+        cy = np.clip((self.y // self.cell).astype(np.int32) + 1, 0, self.rows - 1)
+        keys = cy * self.cols + cx
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def build_pool(self, pool, shape):
+        self.build(pool.x, pool.y, pool.size, pool.count, shape)
+
+    def cell_of(self, v, limit):
+        return min(max(int(v // self.cell) + 1, 0), limit - 1)
+
+    def candidates_in(self, left, top, right, bottom):
+        self.queries += 1
+        if self.count == 0: return np.zeros(0, dtype=np.intp)
+        r = self.reach
+        cx0, cx1 = self.cell_of(left - r, self.cols), self.cell_of(right + r, self.cols)
+        cy0, cy1 = self.cell_of(top - r, self.rows), self.cell_of(bottom + r, self.rows)
+        row_keys = np.arange(cy0, cy1 + 1) * self.cols
+        lo = np.searchsorted(self.keys, row_keys + cx0, 'left').tolist()
+        hi = np.searchsorted(self.keys, row_keys + cx1, 'right').tolist()
+        cand = np.concatenate([self.order[a:b] for a, b in zip(lo, hi)])
+        self.candidates += len(cand)
+        return cand
+
+    def nearest(self, cand, px, py): # 후보 도형 안에서 (px, py)에 가장 가까운 점까지의 거리 제곱
+        x, y, s = self.x[cand], self.y[cand], self.size[cand]
+        if self.shape == 'circle':
+            dx, dy = x - px, y - py
+            d = np.maximum(np.sqrt(dx*dx + dy*dy) - s, 0)
+            return d * d
+        dx = np.clip(px, x, x + s) - px
+        dy = np.clip(py, y, y + s) - py
+        return dx*dx + dy*dy
+
+    def query_rect(self, rect):
+        cand = self.candidates_in(rect.left, rect.top, rect.right, rect.bottom)
+        x, y, s = self.x[cand], self.y[cand], self.size[cand]
+        if self.shape == 'circle':
+            dx = np.clip(x, rect.left, rect.right) - x
+            dy = np.clip(y, rect.top, rect.bottom) - y
+            mask = dx*dx + dy*dy <= s*s
+        else:
+            mask = (x < rect.right) & (x + s > rect.left) & (y < rect.bottom) & (y + s > rect.top)
+        hits = cand[mask]
+        self.hits += len(hits)
+        return hits
+
+    def query_circle(self, cx, cy, radius):
+        cand = self.candidates_in(cx - radius, cy - radius, cx + radius, cy + radius)
+        hits = cand[self.nearest(cand, cx, cy) <= radius * radius]
+        self.hits += len(hits)
+        return hits
+
+    def query_point(self, px, py):
+        return self.query_circle(px, py, 0)
+
+    def query_swept(self, x0, y0, x1, y1, radius, vx, vy, dt):
+        # 'circle' 전용: 점이 (x0, y0)->(x1, y1)로 가는 동안 원들도 (vx, vy)*dt만큼 움직였을 때 한 번이라도 닿은 것
+        # 원 기준으로 보면 점이 직선으로 움직이므로, 그 선분과 원 중심의 최단 거리로 판정 (프레임이 느려도 건너뛰지 않음)
+        n = self.count
+        motion = float(np.abs(vx[:n]).max() + np.abs(vy[:n]).max()) * dt if n else 0.0
+        pad = radius + motion
+        cand = self.candidates_in(min(x0, x1) - pad, min(y0, y1) - pad, max(x0, x1) + pad, max(y0, y1) + pad)
+        ox, oy, s = self.x[cand], self.y[cand], self.size[cand] # 이번 스텝이 끝난 위치
+        sx, sy = x0 - (ox - vx[cand] * dt), y0 - (oy - vy[cand] * dt) # 원 기준 시작점
+        dx, dy = x1 - ox - sx, y1 - oy - sy # 원 기준 이동량
+        t = np.clip(-(sx*dx + sy*dy) / np.maximum(dx*dx + dy*dy, 1e-9), 0, 1)
+        px, py = sx + dx*t, sy + dy*t
+        hits = cand[px*px + py*py <= (s + radius) ** 2]
+        self.hits += len(hits)
+        return hits
+
+    def report(self):
+        return f"[collision] 질의 {self.queries}회, 후보 {self.candidates}쌍, 실제 충돌 {self.hits}쌍"
+collision_grid = SpatialHash()
+
+
+
+# --------------- 입력 ---------------
+ACTION_KEYS = {
+    'left': (pygame.K_LEFT, pygame.K_a),
+    'right': (pygame.K_RIGHT, pygame.K_d),
+    'up': (pygame.K_UP, pygame.K_w),
+    'down': (pygame.K_DOWN, pygame.K_s),
+}
+
+def actions_from(down): # 눌린 키 집합 -> {'left': True, ...}
+    return {name: keys[0] in down or keys[1] in down for name, keys in ACTION_KEYS.items()}
+
+def actions_mask(act): # {'left': True, ...} -> 비트 (녹화용)
+    return sum(1 << i for i, name in enumerate(ACTION_KEYS) if act[name])
+
+def mask_actions(mask):
+    return {name: bool(mask >> i & 1) for i, name in enumerate(ACTION_KEYS)}
+
+class InputBuffer: # 키 눌림/뗌을 시간과 함께 링 버퍼에 기록하고, 업데이트마다 동작 상태로 넘겨줌
+    def __init__(self, size=256):
+        self.size = size
+        self.events = [None] * size # (시각, 키, 눌림 여부)
+        self.head = 0 # 지금까지 기록한 개수 (다음 칸 = head % size)
+        self.held = set()
+        self.tapped = set() # 마지막 업데이트 이후 눌렸던 키 (프레임 사이에 눌렀다 떼도 남음)
+        self.pending = None # 아직 화면에 반영 안 된 첫 입력 시각
+        self.latencies = deque(maxlen=256) # 입력 -> 화면 반영 (ms)
+        self.early = [] # 큐보다 먼저 꺼낸 이벤트 (FrameGovernor.idle)
+
+    def push_front(self, ev): # 다시 post하면 큐 맨 뒤로 가서 KEYDOWN/KEYUP 순서가 뒤집힘
+        self.early.append(ev)
+
+    def pump(self):
+        events = self.early + pygame.event.get()
+        self.early = []
+        for ev in events:
+            if ev.type == pygame.KEYDOWN or ev.type == pygame.KEYUP:
+                now = time.perf_counter()
+                self.events[self.head % self.size] = (now, ev.key, ev.type == pygame.KEYDOWN)
+                self.head += 1
+                if ev.type == pygame.KEYDOWN: self.held.add(ev.key); self.tapped.add(ev.key)
+                else: self.held.discard(ev.key)
+                if self.pending is None: self.pending = now
+            elif ev.type == pygame.WINDOWFOCUSLOST: self.held.clear() # 창 밖에서 뗀 키가 눌린 채로 남지 않게
+            elif ev.type == pygame.WINDOWEXPOSED: renderer.full = True # 가려졌던 창은 전체 다시 표시
+        return events
+
+    def recent(self, n=16): # 최근 기록 n개 (오래된 것부터)
+        n = min(n, self.head, self.size)
+        return [self.events[i % self.size] for i in range(self.head - n, self.head)]
+
+    def actions(self):
+        state = actions_from(self.held | self.tapped)
+        self.tapped = set()
+        return state
+
+    def presented(self): # 화면에 반영한 직후 호출
+        if self.pending is not None:
+            self.latencies.append((time.perf_counter() - self.pending) * 1000)
+            self.pending = None
+
+    def report(self):
+        if not self.latencies: return None
+        lat = sorted(self.latencies)
+        return f"[input] 입력->화면 {len(lat)}회, 평균 {sum(lat)/len(lat):.1f} ms, 최대 {lat[-1]:.1f} ms"
+input_buffer = InputBuffer()
+
+
+
+# --------------- 실행 환경 ---------------
+class FrameGovernor: # 화면마다 프레임 제한 + 안 움직이는 화면은 입력이 올 때까지 잠듦
+    def __init__(self, fps=FPS, idle_fps=IDLE_FPS):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.scene = None
+        self.frames = 0
+
+    def begin(self, scene): # 화면이 바뀔 때마다 호출 (CPU 시간을 화면별로 잼)
+        if self.scene: self.end()
+        self.scene = scene
+        self.frames = 0
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        clock.tick() # 앞 화면에서 흐른 시간이 첫 dt로 들어가지 않게
+
+    def tick(self): # 움직이는 화면: fps로 제한
+        self.frames += 1
+        return clock.tick(self.fps) / 1000.0
+
+    def idle(self, timeout=None): # 안 움직이는 화면: 이벤트가 오거나 timeout(초)이 지날 때까지 대기
+        self.frames += 1
+        wait = 1.0 / self.idle_fps if timeout is None else min(timeout, 1.0 / self.idle_fps)
+        ev = pygame.event.wait(max(1, int(wait * 1000)))
+        if ev.type != pygame.NOEVENT: input_buffer.push_front(ev) # 꺼낸 이벤트는 다음 game_quit에서 큐보다 먼저 처리
+        clock.tick()
+
+    def end(self):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        print(f"[governor] {self.scene}: {self.frames}프레임, {wall:.1f}초, CPU {cpu:.2f}초 ({cpu / max(wall, 1e-6):.0%})")
+        self.scene = None
+governor = FrameGovernor()
+atexit.register(lambda: governor.scene and governor.end()) # ESC로 끝낼 때 마지막 화면도 기록
+
+class RealTime: # 실제 창, 시계, 키보드/마우스
+    headless = False
+
+    def poll(self): game_quit()
+    def tick(self): return governor.tick()
+    def idle(self, timeout): governor.idle(timeout)
+    def now(self): return time.time()
+    def actions(self): return input_buffer.actions()
+    def mouse(self): return pygame.mouse.get_pos()
+    def watch(self, **state): pass
+
+class Simulation: # 화면 없이 가상 시계 + 스크립트 입력으로 최대 속도 실행
+    headless = True
+
+    def __init__(self, provider=None, dt=1.0/FPS):
+        self.provider = provider # provider(sim): sim.pressed / sim.mouse_pos를 정함
+        self.dt = dt
+        self.t = 0.0
+        self.held = 0.0 # hold()로 결과 화면을 보여준 시간 (결과가 난 시각 = t - held)
+        self.frames = 0
+        self.pressed = set()
+        self.mouse_pos = (0, 0)
+        self.state = {} # 미션이 watch로 알려준 객체들 (봇이 봄)
+
+    def poll(self): pass
+
+    def tick(self):
+        self.frames += 1
+        self.t += self.dt
+        if self.provider: self.provider(self)
+        return self.dt
+
+    def idle(self, timeout): self.held += self.dt; self.tick() # 미션 안에서 idle은 hold()에서만 부름
+    def now(self): return self.t
+    def actions(self): return actions_from(self.pressed)
+    def mouse(self): return self.mouse_pos
+    def watch(self, **state): self.state.update(state)
+rt = RealTime() # 미션 함수들은 항상 rt를 통해 시간/입력을 얻음
+
+class FixedStep: # 업데이트는 고정 간격으로, 남은 시간은 그릴 때 보간(alpha)에 사용
+    def __init__(self, step=1.0/FPS, max_steps=5):
+        self.step = step
+        self.max_steps = max_steps # 한 프레임에 이보다 많이 밀리면 나머지는 버림 (느린 PC에서 멈춤 방지)
+        self.acc = 0.0
+        self.time = 0.0 # 업데이트로 진행된 게임 시간
+
+    def steps(self, frame_dt):
+        self.acc += frame_dt
+        n = 0
+        while self.acc >= self.step:
+            if n == self.max_steps: self.acc = 0.0; break
+            self.acc -= self.step
+            self.time += self.step
+            n += 1
+            yield self.step
+
+    @property
+    def alpha(self):
+        return self.acc / self.step
+
+def hold(seconds): # 결과 화면을 보여주는 동안에도 이벤트는 계속 처리 (time.sleep 대신)
+    end = rt.now() + seconds
+    profiler.frame(idle=True) # 미션의 마지막 프레임은 여기서 끝나고, 기다리는 시간은 따로 기록
+    while rt.now() < end:
+        rt.poll()
+        if not rt.headless: renderer.present()
+        rt.idle(end - rt.now())
 
 
 
 # --------------- 미션 함수 ---------------
 def game_quit():
-    for ev in pygame.event.get():
-        if ev.type == pygame.QUIT or ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
+    for ev in input_buffer.pump():
+        if ev.type in (pygame.QUIT, pygame.WINDOWCLOSE) or ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE: # texture 백엔드는 창이 둘이라 QUIT 대신 WINDOWCLOSE만 옴
             pygame.quit(); sys.exit()
+        if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F3: profiler.toggle_overlay() # 프레임 분석 표시
+        if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F9 and capture: capture.dump("hotkey") # 최근 화면 저장
 
         if gs.show_title:
             if ev.type == pygame.MOUSEBUTTONDOWN or ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
@@ -153,477 +1049,816 @@ def game_quit():
             if ev.type == pygame.MOUSEBUTTONDOWN or ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
                 gs.show_narration = False
 
-def mission_day1():
-    player = Entity(WINDOW_W//2 - PLAYER_SIZE//2, WINDOW_H - PLAYER_SIZE - 40, PLAYER_SIZE)
-    cat = Entity(random.randint(40, WINDOW_W-40-CAT_SIZE), random.randint(100, WINDOW_H-160), CAT_SIZE)
-    cat.speed = 280
-    gs.total_time = 20.0
-    start = time.time()
+def mission_day1(content):
+    entities.release_all()
+    player = entities.acquire(WINDOW_W//2 - PLAYER_SIZE//2, WINDOW_H - PLAYER_SIZE - 40, PLAYER_SIZE)
+    cat = entities.acquire(*content['cat'], CAT_SIZE)
+    cat.speed = 280 * BALANCE['cat_speed']
+    gs.total_time = 20.0 * BALANCE['time']
+    ticker = FixedStep()
+    elapsed = 0.0
     change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
-    last_change = time.time()
+    last_change = 0.0
     cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
     cat_facing_left = False
     player_direction = 'front'
+    background = make_background(BG_COLORS[1])
+    draw_text(background, "움직이는 고양이를 잡아보자!", 20, WINDOW_H-40)
+    renderer.set_background(background)
+    rt.watch(player=player, cat=cat)
+
+    def draw_frame(sleeping, alpha=1.0):
+        if rt.headless: return
+        renderer.begin()
+        renderer.mark(draw_timer_bar(elapsed, gs.total_time))
+        renderer.add(draw_player(screen, *player.lerp(alpha), player.size, player_direction, use_white=True))
+        renderer.add(draw_cat(screen, *cat.lerp(alpha), cat.size, flip=cat_facing_left, sleeping=sleeping))
+        profiler.mark('sprites')
+        renderer.text(f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
+        profiler.mark('text')
+        renderer.present()
 
     while True:
-        game_quit()
-
-        dt = clock.tick(FPS) / 1000.0
-        elapsed = time.time() - start
-        screen.fill(BG_COLORS[1])
-
-        keys = pygame.key.get_pressed()
-        move_x = move_y = 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: move_x = -1; player_direction = 'left'
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: move_x = 1; player_direction = 'right'
-        if keys[pygame.K_UP] or keys[pygame.K_w]: move_y = -1
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: move_y = 1
-        if not (keys[pygame.K_LEFT] or keys[pygame.K_a]) and not(keys[pygame.K_RIGHT] or keys[pygame.K_d]) and move_y == 0: player_direction = 'front'
-        if move_x != 0 or move_y != 0:
-            normp = math.hypot(move_x, move_y)
-            player.x += (move_x / normp) * player.speed * dt
-            player.y += (move_y / normp) * player.speed * dt
-        player.x = max(10, min(WINDOW_W - player.size - 10, player.x))
-        player.y = max(80, min(WINDOW_H - player.size - 10, player.y))
-
-        if time.time() - last_change > change_interval:
-            cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
-            change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
-            last_change = time.time()
-        if cat_dir[0] != 0 or cat_dir[1] != 0:
-            normc = math.hypot(cat_dir[0], cat_dir[1])
-            cat.x += (cat_dir[0] / normc) * cat.speed * dt
-            cat.y += (cat_dir[1] / normc) * cat.speed * dt
-            if cat_dir[0] == -1: cat_facing_left = True
-            elif cat_dir[0] == 1: cat_facing_left = False
-        if cat.x < 10: cat.x = 10; cat_dir[0] *= -1
-        if cat.x > WINDOW_W-cat.size-10: cat.x = WINDOW_W-cat.size-10; cat_dir[0] *= -1
-        if cat.y < 80: cat.y = 80; cat_dir[1] *= -1
-        if cat.y > WINDOW_H-cat.size-10: cat.y = WINDOW_H-cat.size-10; cat_dir[1] *= -1
-
-        if player.rect().colliderect(cat.rect()):
-            screen.fill(BG_COLORS[1])
-            draw_timer_bar(elapsed, gs.total_time)
-            draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=True)
-            draw_cat(screen, int(cat.x), int(cat.y), cat.size, flip=cat_facing_left, sleeping=True)
-            draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
-            draw_text(screen, "움직이는 고양이를 잡아보자!", 20, WINDOW_H-40)
-            pygame.display.flip()
-            time.sleep(1)
-            return True
-        draw_timer_bar(elapsed, gs.total_time)
-        draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=True)
-        draw_cat(screen, int(cat.x), int(cat.y), cat.size, flip=cat_facing_left)
-        draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
-        draw_text(screen, "움직이는 고양이를 잡아보자!", 20, WINDOW_H-40)
-        pygame.display.flip()
-        
-        if elapsed >= gs.total_time: return False
-
-def mission_day2():
-    player = Entity(40, WINDOW_H - PLAYER_SIZE - 40, PLAYER_SIZE)
-    cat = Entity(WINDOW_W//2 - CAT_SIZE//2, WINDOW_H//2 - CAT_SIZE//2, CAT_SIZE)
-    gs.total_time = 30.0
-    start = time.time()
+        profiler.frame()
+        rt.poll()
+        profiler.mark('events')
+        frame_dt = rt.tick()
+        profiler.mark('tick')
+
+        for dt in ticker.steps(frame_dt):
+            elapsed = ticker.time
+            player.remember(); cat.remember()
+
+            act = rt.actions()
+            move_x = move_y = 0
+            if act['left']: move_x = -1; player_direction = 'left'
+            if act['right']: move_x = 1; player_direction = 'right'
+            if act['up']: move_y = -1
+            if act['down']: move_y = 1
+            if not act['left'] and not act['right'] and move_y == 0: player_direction = 'front'
+            if move_x != 0 or move_y != 0:
+                normp = math.hypot(move_x, move_y)
+                player.x += (move_x / normp) * player.speed * dt
+                player.y += (move_y / normp) * player.speed * dt
+            player.x = max(10, min(WINDOW_W - player.size - 10, player.x))
+            player.y = max(80, min(WINDOW_H - player.size - 10, player.y))
+
+            if elapsed - last_change > change_interval:
+                cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
+                change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
+                last_change = elapsed
+            if cat_dir[0] != 0 or cat_dir[1] != 0:
+                normc = math.hypot(cat_dir[0], cat_dir[1])
+                cat.x += (cat_dir[0] / normc) * cat.speed * dt
+                cat.y += (cat_dir[1] / normc) * cat.speed * dt
+                if cat_dir[0] == -1: cat_facing_left = True
+                elif cat_dir[0] == 1: cat_facing_left = False
+            if cat.x < 10: cat.x = 10; cat_dir[0] *= -1
+            if cat.x > WINDOW_W-cat.size-10: cat.x = WINDOW_W-cat.size-10; cat_dir[0] *= -1
+            if cat.y < 80: cat.y = 80; cat_dir[1] *= -1
+            if cat.y > WINDOW_H-cat.size-10: cat.y = WINDOW_H-cat.size-10; cat_dir[1] *= -1
+
+            profiler.mark('movement')
+            if player.rect().colliderect(cat.rect()): # 한 쌍뿐이라 격자 없이 바로 검사
+                draw_frame(sleeping=True)
+                hold(1)
+                return True
+            profiler.mark('collision')
+            if elapsed >= gs.total_time: return False
+        draw_frame(sleeping=False, alpha=ticker.alpha)
+
+def mission_day2(content):
+    entities.release_all()
+    player = entities.acquire(40, WINDOW_H - PLAYER_SIZE - 40, PLAYER_SIZE)
+    cat = entities.acquire(WINDOW_W//2 - CAT_SIZE//2, WINDOW_H//2 - CAT_SIZE//2, CAT_SIZE)
+    gs.total_time = 30.0 * BALANCE['time']
+    ticker = FixedStep()
+    elapsed = 0.0
     sound_score = 0
     door = pygame.Rect(WINDOW_W - 80, 80, 60, 80)
     player_direction = 'front'
+    background = make_background(BG_COLORS[2])
+    pygame.draw.rect(background, DOOR, door)
+    draw_text(background, "Door", door.x+6, door.y+door.height+4)
+    draw_text(background, "움직이면 소리 점수 증가, 멈추면 감소 (100 이상이면 고양이가 깨요 ㅠㅠ)", 20, WINDOW_H-40)
+    renderer.set_background(background)
+    rt.watch(player=player, cat=cat, door=door, sound=lambda: sound_score)
+
+    def draw_frame(sleeping, alpha=1.0):
+        if rt.headless: return
+        renderer.begin()
+        renderer.add(draw_cat(screen, int(cat.x), int(cat.y), cat.size, sleeping=sleeping))
+        renderer.add(draw_player(screen, *player.lerp(alpha), player.size, player_direction, use_white=True))
+        renderer.mark(draw_timer_bar(elapsed, gs.total_time))
+        profiler.mark('sprites')
+        renderer.text(f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 65)
+        renderer.text(f"소리 점수: {sound_score}", 20, 45)
+        profiler.mark('text')
+        renderer.present()
 
     while True:
-        game_quit()
-
-        dt = clock.tick(FPS) / 1000.0
-        elapsed = time.time() - start
-
-        keys = pygame.key.get_pressed()
-        move_x = move_y = 0
-        moving = False
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: move_x = -1; moving = True; player_direction = 'left'
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: move_x = 1; moving = True; player_direction = 'right'
-        if keys[pygame.K_UP] or keys[pygame.K_w]: move_y = -1; moving = True
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: move_y = 1; moving = True
-        if not (keys[pygame.K_LEFT] or keys[pygame.K_a]) and not(keys[pygame.K_RIGHT] or keys[pygame.K_d]) and move_y == 0: player_direction = 'front'
-        if move_x != 0 or move_y != 0:
-            norm = math.hypot(move_x, move_y)
-            player.x += (move_x / norm) * player.speed * dt
-            player.y += (move_y / norm) * player.speed * dt
-
-        if moving: sound_score += random.randint(RAND_MIN, RAND_MAX)
-        else: sound_score -= 1
-        sound_score = max(0, sound_score)
-
-        if sound_score >= 100:
-            screen.fill(BG_COLORS[2])
-            pygame.draw.rect(screen, DOOR, door)
-            draw_text(screen, "Door", door.x+6, door.y+door.height+4)
-            draw_cat(screen, int(cat.x), int(cat.y), cat.size, sleeping=False)
-            draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=True)
-            draw_timer_bar(elapsed, gs.total_time)
-            draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 65)
-            draw_text(screen, f"소리 점수: {sound_score}", 20, 45)
-            draw_text(screen, "움직이면 소리 점수 증가, 멈추면 감소 (100 이상이면 고양이가 깨요 ㅠㅠ)", 20, WINDOW_H-40)
-            pygame.display.flip()
-            time.sleep(1)
-            return False
-        if player.rect().colliderect(cat.rect()):
-            screen.fill(BG_COLORS[2])
-            pygame.draw.rect(screen, DOOR, door)
-            draw_text(screen, "Door", door.x+6, door.y+door.height+4)
-            draw_cat(screen, int(cat.x), int(cat.y), cat.size)
-            draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=True)
-            draw_timer_bar(elapsed, gs.total_time)
-            draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 65)
-            draw_text(screen, f"소리 점수: {sound_score}", 20, 45)
-            draw_text(screen, "움직이면 소리 점수 증가, 멈추면 감소 (100 이상이면 고양이가 깨요 ㅠㅠ)", 20, WINDOW_H-40)
-            pygame.display.flip()
-            time.sleep(1)
-            return False
-        if player.rect().colliderect(door):
-            if sound_score < 100: return True
-            else: return False
-        screen.fill(BG_COLORS[2])
-        pygame.draw.rect(screen, DOOR, door)
-        draw_text(screen, "Door", door.x+6, door.y+door.height+4)
-        draw_cat(screen, int(cat.x), int(cat.y), cat.size, sleeping=True)
-        draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=True)
-        draw_timer_bar(elapsed, gs.total_time)
-        draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 65)
-        draw_text(screen, f"소리 점수: {sound_score}", 20, 45)
-        draw_text(screen, "움직이면 소리 점수 증가, 멈추면 감소 (100 이상이면 고양이가 깨요 ㅠㅠ)", 20, WINDOW_H-40)
-        pygame.display.flip()
-
-        if elapsed >= gs.total_time:return False
-
-def generate_maze(cols, rows):
-    maze = np.ones((rows, cols), dtype=int) # 0(통로), 1(벽)
-    stack = []
-    start = (1,1)
-    maze[start[1], start[0]] = 0 # 시작점
-    stack.append(start)
+        profiler.frame()
+        rt.poll()
+        profiler.mark('events')
+        frame_dt = rt.tick()
+        profiler.mark('tick')
+
+        for dt in ticker.steps(frame_dt):
+            elapsed = ticker.time
+            player.remember()
+
+            act = rt.actions()
+            move_x = move_y = 0
+            moving = False
+            if act['left']: move_x = -1; moving = True; player_direction = 'left'
+            if act['right']: move_x = 1; moving = True; player_direction = 'right'
+            if act['up']: move_y = -1; moving = True
+            if act['down']: move_y = 1; moving = True
+            if not act['left'] and not act['right'] and move_y == 0: player_direction = 'front'
+            if move_x != 0 or move_y != 0:
+                norm = math.hypot(move_x, move_y)
+                player.x += (move_x / norm) * player.speed * dt
+                player.y += (move_y / norm) * player.speed * dt
+
+            if moving: sound_score += random.randint(RAND_MIN, RAND_MAX)
+            else: sound_score -= 1
+            sound_score = max(0, sound_score)
+
+            profiler.mark('movement')
+            if sound_score >= 100:
+                draw_frame(sleeping=False)
+                hold(1)
+                return False
+            if player.rect().colliderect(cat.rect()):
+                draw_frame(sleeping=False)
+                hold(1)
+                return False
+            if player.rect().colliderect(door):
+                if sound_score < 100: return True
+                else: return False
+            profiler.mark('collision')
+            if elapsed >= gs.total_time:return False
+        draw_frame(sleeping=True, alpha=ticker.alpha)
+
+# 미로는 0(통로), 1(벽)인 uint8 배열. 홀수 좌표가 방, 그 사이 칸이 벽
+# 가로/세로가 짝수면 오른쪽/아래 테두리가 두 칸 벽이 됨 (방은 항상 테두리 안쪽)
+def maze_rooms(cols, rows, pad): # 아직 안 뚫은 방이면 1. 뒤에 0을 pad칸 붙여서 가장자리 검사를 없앰 (음수 인덱스도 여기로 감)
+    avail = bytearray(cols * rows + pad)
+    per_row = len(range(1, cols - 1, 2)) # 한 줄의 방 개수 (짝수 가로도 맞게)
+    for r in range(1, rows - 1, 2): avail[r*cols + 1:(r+1)*cols - 1:2] = b"\x01" * per_row
+    return avail
+
+def maze_backtracker(cols, rows, rng):
+    grid = bytearray(b"\x01") * (cols * rows) # numpy 원소 접근보다 bytearray가 훨씬 빠름
+    down = 2 * cols
+    avail = maze_rooms(cols, rows, down)
+    getrandbits = rng.getrandbits
+    start = cols + 1 # (1,1)
+    grid[start] = 0; avail[start] = 0
+    stack = [start]
+    push, pop = stack.append, stack.pop
     while stack:
-        x,y = stack[-1]
-        neighbors = []
+        i = stack[-1]
 
         # 2칸 떨어진 위치 탐색 (벽 사이에 통로 만들기)
-        for dx,dy in [(2,0),(-2,0),(0,2),(0,-2)]:
-            nx, ny = x+dx, y+dy
-            if 0 < nx < cols and 0 < ny < rows and maze[ny, nx] == 1: neighbors.append((nx,ny))
-        if neighbors:
-            nx,ny = random.choice(neighbors)
-            bx, by = (x+nx)//2, (y+ny)//2 # 중간 벽 제거
-            maze[by, bx] = 0
-            maze[ny, nx] = 0
-            stack.append((nx,ny))
-        else: stack.pop() # 막다른 곳이면 백트래킹
-    return maze
-
-def mission_day3():
-    cols = (WINDOW_W // TILE) | 1
-    rows = ((WINDOW_H - 120) // TILE) | 1
-    maze = generate_maze(cols, rows)
+        a, b, c, d = avail[i+2], avail[i-2], avail[i+down], avail[i-down]
+        k = a + b + c + d
+        if not k: pop(); continue # 막다른 곳이면 백트래킹
+        if k == 1: n = i+2 if a else i-2 if b else i+down if c else i-down
+        else:
+            neighbors = []
+            if a: neighbors.append(i+2)
+            if b: neighbors.append(i-2)
+            if c: neighbors.append(i+down)
+            if d: neighbors.append(i-down)
+            bits = 3 if k == 4 else 2 # rng.randrange(k)와 같은 값을 함수 호출 없이 뽑음
+            r = getrandbits(bits)
+            while r >= k: r = getrandbits(bits)
+            n = neighbors[r]
+        grid[(i+n) >> 1] = 0 # 중간 벽 제거
+        grid[n] = 0; avail[n] = 0
+        push(n)
+    return grid
+
+def maze_prim(cols, rows, rng):
+    grid = bytearray(b"\x01") * (cols * rows)
+    down = 2 * cols
+    avail = maze_rooms(cols, rows, down)
+    getrandbits = rng.getrandbits
+    frontier = [] # 후보 벽. 양쪽 중 안 뚫린 방이 있으면 그쪽으로 뚫음
+    push, pop = frontier.append, frontier.pop
+    cell = cols + 1
+    while True:
+        grid[cell] = 0; avail[cell] = 0
+        if avail[cell+2]: push(cell+1)
+        if avail[cell-2]: push(cell-1)
+        if avail[cell+down]: push(cell+cols)
+        if avail[cell-down]: push(cell-cols)
+        while frontier:
+            n = len(frontier); bits = n.bit_length()
+            k = getrandbits(bits) # rng.randrange(n)와 같은 값
+            while k >= n: k = getrandbits(bits)
+            wall = frontier[k]; frontier[k] = frontier[-1]; pop() # 뒤로 보낸 다음 pop
+            if avail[wall+1]: cell = wall+1
+            elif avail[wall-1]: cell = wall-1
+            elif avail[wall+cols]: cell = wall+cols
+            elif avail[wall-cols]: cell = wall-cols
+            else: continue
+            grid[wall] = 0
+            break
+        else: return grid
+
+def maze_eller(cols, rows, rng):
+    # 한 줄씩 만드는 방식이라 메모리는 가로 길이만큼만 필요
+    grid = bytearray(b"\x01") * (cols * rows)
+    w, h = (cols - 1) // 2, (rows - 1) // 2 # 짝수 크기에서도 마지막 줄/칸은 테두리로 남김
+    labels = list(range(w)) # 이번 줄 방들의 집합 번호
+    for r in range(h):
+        base = (2*r + 1) * cols
+        last = r == h - 1
+        parent = list(range(w))
+
+        def find(a):
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        for c in range(w): grid[base + 2*c + 1] = 0
+        for c in range(w - 1): # 옆 방과 합치기 (마지막 줄은 전부 합침)
+            a, b = find(labels[c]), find(labels[c+1])
+            if a != b and (last or rng.getrandbits(1)):
+                parent[b] = a
+                grid[base + 2*c + 2] = 0
+        if last: break
+
+        groups = {}
+        for c in range(w): groups.setdefault(find(labels[c]), []).append(c)
+        labels = [-1] * w
+        next_label = 0
+        for members in groups.values(): # 집합마다 최소 한 칸은 아래로 뚫음
+            downs = [c for c in members if rng.getrandbits(1)]
+            if not downs: downs = [members[rng.randrange(len(members))]]
+            for c in downs:
+                grid[base + cols + 2*c + 1] = 0
+                labels[c] = next_label
+            next_label += 1
+        for c in range(w):
+            if labels[c] < 0: labels[c] = next_label; next_label += 1
+    return grid
+
+MAZE_ALGORITHMS = {'backtracker': maze_backtracker, 'prim': maze_prim, 'eller': maze_eller}
+
+def generate_maze(cols, rows, algorithm='backtracker', seed=None):
+    rng = random if seed is None else random.Random(seed) # seed가 없으면 게임 전체 random 사용
+    grid = MAZE_ALGORITHMS[algorithm](cols, rows, rng)
+    return np.frombuffer(grid, dtype=np.uint8).reshape(rows, cols)
+
+class DistanceField: # source에서 모든 칸까지의 BFS 거리 (-1이면 못 가는 곳)
+    def __init__(self, maze, source):
+        self.rows, self.cols = maze.shape
+        self.source = source
+        cols = self.cols
+        size = self.rows * cols
+        grid = maze.tobytes()
+        dist = [-1] * size # BFS 중에는 list가 빠르고, 끝나면 int32 배열로 바꿈
+        s = source[1]*cols + source[0]
+        dist[s] = 0
+        frontier = [s]
+        d = 0
+        while True: # 한 단계(거리)씩 frontier를 넓혀감
+            nxt = []
+            d += 1
+            for i in frontier:
+                x = i % cols
+                if x + 1 < cols and not grid[i+1] and dist[i+1] < 0: dist[i+1] = d; nxt.append(i+1)
+                if x > 0 and not grid[i-1] and dist[i-1] < 0: dist[i-1] = d; nxt.append(i-1)
+                j = i + cols
+                if j < size and not grid[j] and dist[j] < 0: dist[j] = d; nxt.append(j)
+                j = i - cols
+                if j >= 0 and not grid[j] and dist[j] < 0: dist[j] = d; nxt.append(j)
+            if not nxt: break
+            frontier = nxt
+        self.dist = np.array(dist, dtype=np.int32)
+        self.far_d = d - 1
+        self.far = (frontier[0] % cols, frontier[0] // cols) # 가장 먼 지점 (처음 도착한 칸)
+
+    def distance(self, x, y):
+        return int(self.dist[y*self.cols + x])
+
+    def farthest(self):
+        return self.far
+
+    def path_to(self, x, y): # source -> (x, y) 최단 경로, 거리가 1씩 줄어드는 칸을 따라 거꾸로 감
+        cols = self.cols
+        dist = self.dist
+        i = y*cols + x
+        d = int(dist[i])
+        if d < 0: return []
+        path = [i]
+        while d > 0:
+            d -= 1
+            for j in (i+1, i-1, i+cols, i-cols):
+                if 0 <= j < len(dist) and abs(j % cols - i % cols) <= 1 and dist[j] == d:
+                    i = j
+                    break
+            path.append(i)
+        return [(i % cols, i // cols) for i in reversed(path)]
+
+distance_fields = OrderedDict() # (id(maze), source) -> (maze, DistanceField)
+
+def distance_field(maze, source=(1,1)): # 같은 미로/시작점이면 다시 계산하지 않음
+    key = (id(maze), source)
+    cached = distance_fields.get(key)
+    if cached is not None and cached[0] is maze:
+        distance_fields.move_to_end(key)
+        return cached[1]
+    field = DistanceField(maze, source)
+    distance_fields[key] = (maze, field)
+    if len(distance_fields) > 8: distance_fields.popitem(last=False)
+    return field
+
+def bake_maze(maze, offset_x, offset_y): # 미로는 안 바뀌니까 한 번만 그려둠
+    layer = make_background(BG_COLORS[3])
+    draw_maze_tiles(layer, maze, offset_x, offset_y)
+    return layer
+
+def draw_maze_tiles(surf, maze, offset_x, offset_y): # 타일 하나씩 그리기 (예전 방식)
+    rows, cols = maze.shape
+    for y in range(rows):
+        for x in range(cols):
+            rect = pygame.Rect(offset_x + x*TILE, offset_y + y*TILE, TILE, TILE)
+            if maze[y,x] == 1: pygame.draw.rect(surf, MAZE_WALL, rect)
+            else: pygame.draw.rect(surf, MAZE_ROAD, rect)
+
+MAZE_CHUNK = 16 # 큰 미로에서 청크 하나 = 16x16 타일
+
+class MazeChunks: # 큰 미로를 청크 단위 surface로 나눠 필요할 때 만들고, 오래 안 쓴 것은 버림
+    def __init__(self, maze, chunk=MAZE_CHUNK, max_chunks=64):
+        self.maze = maze
+        self.chunk = chunk
+        self.max_chunks = max_chunks # 화면에 걸치는 청크 수(약 12개)보다 넉넉하게
+        self.surfaces = OrderedDict()
+        self.built = 0
+        self.palette = np.array([MAZE_ROAD, MAZE_WALL], dtype=np.uint8)
+
+    def surface(self, cx, cy):
+        key = (cx, cy)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+        n = self.chunk
+        block = self.maze[cy*n:(cy+1)*n, cx*n:(cx+1)*n]
+        small = pygame.surfarray.make_surface(self.palette[block.T]) # 타일 하나 = 1픽셀로 만든 뒤
+        surf = pygame.transform.scale(small, (block.shape[1]*TILE, block.shape[0]*TILE)) # TILE배로 늘림 (보간 없음)
+        if pygame.display.get_surface(): surf = surf.convert()
+        self.surfaces[key] = surf
+        self.built += 1
+        if len(self.surfaces) > self.max_chunks: self.surfaces.popitem(last=False)
+        return surf
+
+    def draw(self, target, cam_x, cam_y): # 화면에 걸치는 청크만 그림 (미로 크기와 상관없이 일정)
+        size = self.chunk * TILE
+        rows, cols = self.maze.shape
+        w, h = target.get_size()
+        for cy in range(max(0, cam_y // size), min((rows - 1) // self.chunk, (cam_y + h - 1) // size) + 1):
+            for cx in range(max(0, cam_x // size), min((cols - 1) // self.chunk, (cam_x + w - 1) // size) + 1):
+                target.blit(self.surface(cx, cy), (cx*size - cam_x, cy*size - cam_y))
+
+def camera_axis(pos, world, view): # 한 축의 카메라 위치 (미로가 화면보다 작으면 가운데 정렬)
+    if world <= view: return (world - view) // 2
+    return max(0, min(world - view, pos - view // 2))
+
+MAZE_FIT = ((WINDOW_W // TILE) | 1, ((WINDOW_H - 120) // TILE) | 1) # 화면에 맞춘 기본 미로 크기
+
+def maze_size(): # --maze-size 401x401 이면 화면보다 큰 미로 (카메라가 플레이어를 따라감)
+    size = arg_value("--maze-size")
+    if size is None: return MAZE_FIT
+    cols, rows = (int(v) | 1 for v in size.split("x"))
+    return cols, rows
+
+def maze_scrolls(cols, rows): # 기본 크기보다 크면 청크 + 카메라로 그림
+    return cols > MAZE_FIT[0] or rows > MAZE_FIT[1]
+
+def mission_day3(content):
+    maze, field = content['maze'], content['field']
+    rows, cols = maze.shape
     start = (1,1)
 
-    def farthest_cell():
-        visited = set()
-        q = deque()
-        q.append((start,0)) # (위치, 거리)
-        visited.add(start)
-        far = start
-        far_d = 0
-        while q:
-            (x,y),d = q.popleft()
-            if d > far_d:
-                far_d = d
-                far = (x,y) # 가장 먼 지점 업데이트
-
-            # 4방향 탐색
-            for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-                nx, ny = x+dx, y+dy
-                if 0 <= nx < cols and 0 <= ny < rows and maze[ny,nx]==0 and (nx,ny) not in visited:
-                    visited.add((nx,ny))
-                    q.append(((nx,ny), d+1))
-        return far
-
-    goal_x, goal_y = farthest_cell()
+    goal_x, goal_y = content['goal'] # 시작점에서 가장 먼 곳에 고양이
     player_x, player_y = start
     grid_w = cols * TILE
     grid_h = rows * TILE
     offset_x = (WINDOW_W - grid_w)//2
     offset_y = (WINDOW_H - grid_h)//2
+    scrolling = maze_scrolls(cols, rows)
 
-    gs.total_time = 30.0
-    start_time = time.time()
+    gs.total_time = 30.0 * BALANCE['time']
+    if scrolling: gs.total_time = max(gs.total_time, field.distance(goal_x, goal_y) * MOVE_REPEAT * 1.5) # 큰 미로는 길이에 맞춰
+    ticker = FixedStep()
+    elapsed = 0.0
+    move_timer = 0.0 # 방향키를 누르고 있으면 MOVE_REPEAT마다 한 칸씩
     player_direction = 'front'
+    if scrolling:
+        chunks = MazeChunks(maze)
+        view = None
+    elif not rt.headless:
+        maze_layer = content['layer'].convert() if 'layer' in content else bake_maze(maze, offset_x, offset_y)
+        draw_text(maze_layer, "고영희가 있는 곳까지 빨리 가야해...", 20, WINDOW_H-40)
+        renderer.set_background(maze_layer)
+    rt.watch(maze=maze, goal=(goal_x, goal_y), pos=lambda: (player_x, player_y))
+
+    def follow_camera(): # 플레이어가 화면 가운데 영역을 벗어날 때만 카메라를 옮기고 배경을 다시 그림
+        nonlocal offset_x, offset_y, view
+        sx, sy = offset_x + player_x*TILE, offset_y + player_y*TILE
+        if view is not None and WINDOW_W//4 <= sx < WINDOW_W*3//4 and WINDOW_H//4 <= sy < WINDOW_H*3//4: return
+        offset_x = -camera_axis(player_x*TILE + TILE//2, grid_w, WINDOW_W)
+        offset_y = -camera_axis(player_y*TILE + TILE//2, grid_h, WINDOW_H)
+        if view is None: view = pygame.Surface((WINDOW_W, WINDOW_H)).convert()
+        view.fill(BG_COLORS[3])
+        chunks.draw(view, -offset_x, -offset_y)
+        draw_text(view, "고영희가 있는 곳까지 빨리 가야해...", 20, WINDOW_H-40)
+        renderer.set_background(view)
+
+    def draw_frame(sleeping): # 지난 프레임에 그린 곳만 미로 배경으로 복구하고 다시 그림
+        if rt.headless: return
+        if scrolling: follow_camera()
+        renderer.begin()
+        renderer.add(draw_cat(screen, offset_x + goal_x*TILE + (TILE - CAT_SIZE)//2, offset_y + goal_y*TILE + (TILE - CAT_SIZE)//2, CAT_SIZE, sleeping=sleeping))
+        renderer.add(draw_player(screen, offset_x + player_x*TILE + (TILE - PLAYER_SIZE)//2, offset_y + player_y*TILE + (TILE - PLAYER_SIZE)//2, PLAYER_SIZE, player_direction, use_white=False))
+        renderer.mark(draw_timer_bar(elapsed, gs.total_time))
+        profiler.mark('sprites')
+        renderer.text(f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
+        profiler.mark('text')
+        renderer.present()
 
     while True:
-        game_quit()
-
-        elapsed = time.time() - start_time
-
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            nx = player_x-1
-            if nx>=0 and maze[player_y,nx]==0: player_x = nx; player_direction = 'left'; time.sleep(0.08)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            nx = player_x+1
-            if nx<cols and maze[player_y,nx]==0: player_x = nx; player_direction = 'right'; time.sleep(0.08)
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            ny = player_y-1
-            if ny>=0 and maze[ny,player_x]==0: player_y = ny; time.sleep(0.08)
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            ny = player_y+1
-            if ny<rows and maze[ny,player_x]==0: player_y = ny; time.sleep(0.08)
-
-        if (player_x, player_y) == (goal_x, goal_y+1) or (player_x, player_y) == (goal_x, goal_y-1) or (player_x, player_y) == (goal_x+1, goal_y) or (player_x, player_y) == (goal_x-1, goal_y):
-            screen.fill(BG_COLORS[3])
-            for y in range(rows):
-                for x in range(cols):
-                    rect = pygame.Rect(offset_x + x*TILE, offset_y + y*TILE, TILE, TILE)
-                    if maze[y,x] == 1: pygame.draw.rect(screen, MAZE_WALL, rect)
-                    else: pygame.draw.rect(screen, MAZE_ROAD, rect)
-            draw_cat(screen, offset_x + goal_x*TILE + (TILE - CAT_SIZE)//2, offset_y + goal_y*TILE + (TILE - CAT_SIZE)//2, CAT_SIZE, sleeping=False)
-            draw_player(screen, offset_x + player_x*TILE + (TILE - PLAYER_SIZE)//2, offset_y + player_y*TILE + (TILE - PLAYER_SIZE)//2, PLAYER_SIZE, player_direction, use_white=False)
-            draw_timer_bar(elapsed, gs.total_time)
-            draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
-            draw_text(screen, "고영희가 있는 곳까지 빨리 가야해...", 20, WINDOW_H-40)
-            pygame.display.flip()
-            time.sleep(1)
-            return True
-        screen.fill(BG_COLORS[3])
-        for y in range(rows):
-            for x in range(cols):
-                rect = pygame.Rect(offset_x + x*TILE, offset_y + y*TILE, TILE, TILE)
-                if maze[y,x] == 1: pygame.draw.rect(screen, MAZE_WALL, rect)
-                else: pygame.draw.rect(screen, MAZE_ROAD, rect)
-        draw_cat(screen, offset_x + goal_x*TILE + (TILE - CAT_SIZE)//2, offset_y + goal_y*TILE + (TILE - CAT_SIZE)//2, CAT_SIZE, sleeping=True)
-        draw_player(screen, offset_x + player_x*TILE + (TILE - PLAYER_SIZE)//2, offset_y + player_y*TILE + (TILE - PLAYER_SIZE)//2, PLAYER_SIZE, player_direction, use_white=False)
-        draw_timer_bar(elapsed, gs.total_time)
-        draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45)
-        draw_text(screen, "고영희가 있는 곳까지 빨리 가야해...", 20, WINDOW_H-40)
-        pygame.display.flip()
-
-        if elapsed >= gs.total_time: return False
-
-def mission_day4():
-    player = Entity(random.randint(40, WINDOW_W-40-PLAYER_SIZE), random.randint(120, WINDOW_H-120-PLAYER_SIZE), PLAYER_SIZE)
-    cat = Entity(random.randint(40, WINDOW_W-40-CAT_SIZE), random.randint(120, WINDOW_H-120-CAT_SIZE), CAT_SIZE)
-    cat.speed = 200
-    gs.total_time = 10.0
-    start = time.time()
-    obstacles = []
+        profiler.frame()
+        rt.poll()
+        profiler.mark('events')
+        frame_dt = rt.tick()
+        profiler.mark('tick')
+
+        for dt in ticker.steps(frame_dt):
+            elapsed = ticker.time
+            move_timer = max(0.0, move_timer - dt)
+
+            act = rt.actions()
+            if move_timer == 0.0:
+                moved = False
+                if act['left']:
+                    nx = player_x-1
+                    if nx>=0 and maze[player_y,nx]==0: player_x = nx; player_direction = 'left'; moved = True
+                if act['right']:
+                    nx = player_x+1
+                    if nx<cols and maze[player_y,nx]==0: player_x = nx; player_direction = 'right'; moved = True
+                if act['up']:
+                    ny = player_y-1
+                    if ny>=0 and maze[ny,player_x]==0: player_y = ny; moved = True
+                if act['down']:
+                    ny = player_y+1
+                    if ny<rows and maze[ny,player_x]==0: player_y = ny; moved = True
+                if moved: move_timer = MOVE_REPEAT
+
+            profiler.mark('movement')
+            if (player_x, player_y) == (goal_x, goal_y+1) or (player_x, player_y) == (goal_x, goal_y-1) or (player_x, player_y) == (goal_x+1, goal_y) or (player_x, player_y) == (goal_x-1, goal_y):
+                draw_frame(sleeping=False)
+                hold(1)
+                return True
+            if elapsed >= gs.total_time: return False
+        draw_frame(sleeping=True)
+
+def mission_day4(content):
+    entities.release_all()
+    player = entities.acquire(*content['player'], PLAYER_SIZE)
+    cat = entities.acquire(*content['cat'], CAT_SIZE)
+    cat.speed = 200 * BALANCE['cat_speed']
+    gs.total_time = 10.0 * BALANCE['time']
+    ticker = FixedStep()
+    elapsed = 0.0
+    obstacles = ObstaclePool.shared()
     spawn_timer = 0
-    spawn_interval = max(0.3, random.randint(RAND_MIN, RAND_MAX) / 20.0)
+    spawn_interval = max(0.3, random.randint(RAND_MIN, RAND_MAX) / 20.0) * BALANCE['spawn']
     change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
-    last_change = time.time()
+    last_change = 0.0
     cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
     cat_facing_left = False
     player_direction = 'front'
+    background = make_background(BG_COLORS[4])
+    draw_text(background, "고영희와 고영희가 뿌리는 사료를 피해서 도망쳐야겠어..!", 20, WINDOW_H-40, color=BLACK)
+    renderer.set_background(background)
+    rt.watch(player=player, cat=cat, obstacles=obstacles)
+
+    def draw_frame(alpha=1.0):
+        if rt.headless: return
+        renderer.begin()
+        renderer.add(draw_player(screen, *player.lerp(alpha), player.size, player_direction, use_white=False))
+        renderer.add(draw_cat(screen, *cat.lerp(alpha), cat.size, flip=cat_facing_left))
+        for x, y, size, _ in obstacles.rows(): renderer.add(fill_to(screen, CAT_FOOD, (int(x), int(y), int(size), int(size))))
+        renderer.mark(draw_timer_bar(elapsed, gs.total_time))
+        profiler.mark('sprites')
+        renderer.text(f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45, color=BLACK)
+        profiler.mark('text')
+        renderer.present()
 
     while True:
-        game_quit()
-
-        dt = clock.tick(FPS) / 1000.0
-        elapsed = time.time() - start
-        
-        keys = pygame.key.get_pressed()
-        move_x = move_y = 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: move_x = -1; player_direction = 'left'
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: move_x = 1; player_direction = 'right'
-        if keys[pygame.K_UP] or keys[pygame.K_w]: move_y = -1
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: move_y = 1
-        if not (keys[pygame.K_LEFT] or keys[pygame.K_a]) and not(keys[pygame.K_RIGHT] or keys[pygame.K_d]) and move_y == 0: player_direction = 'front'
-        if move_x != 0 or move_y != 0:
-            norm = math.hypot(move_x, move_y)
-            player.x += (move_x / norm) * player.speed * dt
-            player.y += (move_y / norm) * player.speed * dt
-        player.x = max(10, min(WINDOW_W-player.size-10, player.x))
-        player.y = max(80, min(WINDOW_H-player.size-10, player.y))
-
-        if time.time() - last_change > change_interval:
-            cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
-            change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
-            last_change = time.time()
-        if cat_dir[0] != 0 or cat_dir[1] != 0:
-            normc = math.hypot(cat_dir[0], cat_dir[1])
-            cat.x += (cat_dir[0] / normc) * cat.speed * dt
-            cat.y += (cat_dir[1] / normc) * cat.speed * dt
-            if cat_dir[0] < 0: cat_facing_left = True
-            elif cat_dir[0] > 0: cat_facing_left = False
-        if cat.x < 10: cat.x = 10; cat_dir[0] *= -1
-        if cat.x > WINDOW_W-cat.size-10: cat.x = WINDOW_W-cat.size-10; cat_dir[0] *= -1
-        if cat.y < 80: cat.y = 80; cat_dir[1] *= -1
-        if cat.y > WINDOW_H-cat.size-10: cat.y = WINDOW_H-cat.size-10; cat_dir[1] *= -1
-
-        spawn_timer += dt
-        if spawn_timer >= spawn_interval:
-            spawn_timer = 0
-            spawn_interval = max(0.2, random.randint(RAND_MIN, RAND_MAX) / 20.0)
-            side = random.choice(['top','left','right'])
-            if side == 'top': sx = random.randint(20, WINDOW_W-20); sy = 80
-            elif side == 'left': sx = 20; sy = random.randint(80, WINDOW_H-60)
-            else: sx = WINDOW_W - 40; sy = random.randint(80, WINDOW_H-60)
-            dx = (player.x - sx) + random.uniform(-60,60)
-            dy = (player.y - sy) + random.uniform(-60,60)
-            dist = math.hypot(dx,dy)
-            speed = random.randint(100, 220)
-            vx, vy = dx/dist*speed, dy/dist*speed
-            obstacles.append({'x':sx, 'y':sy, 'w':14, 'h':14, 'vx':vx, 'vy':vy})
-        for ob in obstacles:
-            ob['x'] += ob['vx'] * dt
-            ob['y'] += ob['vy'] * dt
-
-        for ob in obstacles:
-            if player.rect().colliderect(pygame.Rect(ob['x'], ob['y'], ob['w'], ob['h'])): return False
-            if cat.rect().colliderect(pygame.Rect(ob['x'], ob['y'], ob['w'], ob['h'])): obstacles.remove(ob)
-        if player.rect().colliderect(cat.rect()): return False
-        screen.fill(BG_COLORS[4])
-        draw_player(screen, int(player.x), int(player.y), player.size, player_direction, use_white=False)
-        draw_cat(screen, int(cat.x), int(cat.y), cat.size, flip=cat_facing_left)
-        for ob in obstacles: pygame.draw.rect(screen, CAT_FOOD, (int(ob['x']), int(ob['y']), ob['w'], ob['h']))
-        draw_timer_bar(elapsed, gs.total_time)
-        draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45, color=BLACK)
-        draw_text(screen, "고영희와 고영희가 뿌리는 사료를 피해서 도망쳐야겠어..!", 20, WINDOW_H-40, color=BLACK)
-        pygame.display.flip()
-
-        if elapsed >= gs.total_time: return True
-
-def mission_day5():
+        profiler.frame()
+        rt.poll()
+        profiler.mark('events')
+        frame_dt = rt.tick()
+        profiler.mark('tick')
+
+        for dt in ticker.steps(frame_dt):
+            elapsed = ticker.time
+            player.remember(); cat.remember()
+
+            act = rt.actions()
+            move_x = move_y = 0
+            if act['left']: move_x = -1; player_direction = 'left'
+            if act['right']: move_x = 1; player_direction = 'right'
+            if act['up']: move_y = -1
+            if act['down']: move_y = 1
+            if not act['left'] and not act['right'] and move_y == 0: player_direction = 'front'
+            if move_x != 0 or move_y != 0:
+                norm = math.hypot(move_x, move_y)
+                player.x += (move_x / norm) * player.speed * dt
+                player.y += (move_y / norm) * player.speed * dt
+            player.x = max(10, min(WINDOW_W-player.size-10, player.x))
+            player.y = max(80, min(WINDOW_H-player.size-10, player.y))
+
+            if elapsed - last_change > change_interval:
+                cat_dir = [random.choice([-1,0,1]), random.choice([-1,0,1])]
+                change_interval = random.randint(RAND_MIN, RAND_MAX) / 10.0 + 0.3
+                last_change = elapsed
+            if cat_dir[0] != 0 or cat_dir[1] != 0:
+                normc = math.hypot(cat_dir[0], cat_dir[1])
+                cat.x += (cat_dir[0] / normc) * cat.speed * dt
+                cat.y += (cat_dir[1] / normc) * cat.speed * dt
+                if cat_dir[0] < 0: cat_facing_left = True
+                elif cat_dir[0] > 0: cat_facing_left = False
+            if cat.x < 10: cat.x = 10; cat_dir[0] *= -1
+            if cat.x > WINDOW_W-cat.size-10: cat.x = WINDOW_W-cat.size-10; cat_dir[0] *= -1
+            if cat.y < 80: cat.y = 80; cat_dir[1] *= -1
+            if cat.y > WINDOW_H-cat.size-10: cat.y = WINDOW_H-cat.size-10; cat_dir[1] *= -1
+
+            profiler.mark('movement')
+            spawn_timer += dt
+            if spawn_timer >= spawn_interval:
+                spawn_timer = 0
+                spawn_interval = max(0.2, random.randint(RAND_MIN, RAND_MAX) / 20.0) * BALANCE['spawn']
+                side = random.choice(['top','left','right'])
+                if side == 'top': sx = random.randint(20, WINDOW_W-20); sy = 80
+                elif side == 'left': sx = 20; sy = random.randint(80, WINDOW_H-60)
+                else: sx = WINDOW_W - 40; sy = random.randint(80, WINDOW_H-60)
+                dx = (player.x - sx) + random.uniform(-60,60)
+                dy = (player.y - sy) + random.uniform(-60,60)
+                dist = math.hypot(dx,dy)
+                speed = random.randint(100, 220)
+                vx, vy = dx/dist*speed, dy/dist*speed
+                obstacles.spawn(sx, sy, vx, vy, 14)
+            profiler.mark('spawn')
+            obstacles.update(dt)
+            obstacles.cull()
+            profiler.mark('movement')
+
+            collision_grid.build_pool(obstacles, 'rect')
+            if len(collision_grid.query_rect(player.rect())): return False
+            obstacles.remove_at(collision_grid.query_rect(cat.rect())) # 고양이가 먹은 사료
+            if player.rect().colliderect(cat.rect()): return False
+            profiler.mark('collision')
+            if elapsed >= gs.total_time: return True
+        draw_frame(alpha=ticker.alpha)
+
+def mission_day5(content):
     cat_x, cat_y = WINDOW_W//2 - CAT_SIZE//2, WINDOW_H//2 - CAT_SIZE//2
-    gs.total_time = 10.0
-    start = time.time()
-    obstacles = []
+    gs.total_time = 10.0 * BALANCE['time']
+    ticker = FixedStep()
+    elapsed = 0.0
+    obstacles = ObstaclePool.shared()
     spawn_timer = 0
-    spawn_interval = max(0.4, random.randint(RAND_MIN, RAND_MAX)/20.0)
+    spawn_interval = max(0.4, random.randint(RAND_MIN, RAND_MAX)/20.0) * BALANCE['spawn']
+    background = make_background(BG_COLORS[5])
+    draw_text(background, "마우스가 닿게 하여 장애물들을 제거하세요!", 20, WINDOW_H-40, color=BLACK)
+    renderer.set_background(background)
+    rt.watch(cat=(cat_x + CAT_SIZE/2, cat_y + CAT_SIZE/2), obstacles=obstacles)
+    last_mouse = None # 지난 스텝의 마우스 위치 (그 사이 지나간 길 전체로 판정)
+
+    def draw_frame(sleeping):
+        if rt.headless: return
+        renderer.begin()
+        renderer.add(draw_cat(screen, cat_x, cat_y, CAT_SIZE, sleeping=sleeping))
+        for x, y, r, kind in obstacles.rows():
+            renderer.add(circle_to(screen, OBSTACLE_COLORS[kind], (int(x), int(y)), int(r)))
+        renderer.mark(draw_timer_bar(elapsed, gs.total_time))
+        profiler.mark('sprites')
+        renderer.text(f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45, BLACK)
+        profiler.mark('text')
+        renderer.present()
 
     while True:
-        game_quit()
-
-        dt = clock.tick(FPS) / 1000.0
-        elapsed = time.time() - start
-        spawn_timer += dt
-        if spawn_timer >= spawn_interval:
-            spawn_timer = 0
-            spawn_interval = max(0.25, random.randint(RAND_MIN, RAND_MAX)/20.0)
-            side = random.choice(['top','left','right','bottom'])
-            if side == 'top': sx = random.randint(20, WINDOW_W-20); sy = 80
-            elif side == 'bottom': sx = random.randint(20, WINDOW_W-20); sy = WINDOW_H-20
-            elif side == 'left': sx = 20; sy = random.randint(80, WINDOW_H-60)
-            else: sx = WINDOW_W-20; sy = random.randint(80, WINDOW_H-60)
-            typ = random.choice(['dust','fly','wind'])
-            r = 10 if typ in ('dust','fly') else 16
-            dx = (cat_x - sx) + random.uniform(-40,40)
-            dy = (cat_y - sy) + random.uniform(-40,40)
-            dist = max(1, math.hypot(dx,dy))
-            speed = random.randint(60, 180)
-            vx, vy = dx/dist*speed, dy/dist*speed
-            obstacles.append({'x':sx, 'y':sy, 'r':r, 'vx':vx, 'vy':vy, 'type':typ})
-        for ob in obstacles:
-            ob['x'] += ob['vx'] * dt
-            ob['y'] += ob['vy'] * dt
-
-        mx, my = pygame.mouse.get_pos()
-        obstacles = [ob for ob in obstacles if math.hypot(ob['x'] - mx, ob['y'] - my) > ob['r'] + 4]
-
-        cx, cy = cat_x + CAT_SIZE/2, cat_y + CAT_SIZE/2
-        for ob in obstacles:
-            if math.hypot(ob['x'] - cx, ob['y'] - cy) <= ob['r'] + CAT_SIZE/2 - 4:
-                screen.fill(BG_COLORS[5])
-                draw_cat(screen, cat_x, cat_y, CAT_SIZE)
-                for ob in obstacles:
-                    color = DUST if ob['type']=='dust' else FLY if ob['type']=='fly' else WIND
-                    pygame.draw.circle(screen, color, (int(ob['x']), int(ob['y'])), ob['r'])
-                draw_timer_bar(elapsed, gs.total_time)
-                draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45, BLACK)
-                draw_text(screen, "마우스가 닿게 하여 장애물들을 제거하세요!", 20, WINDOW_H-40, color=BLACK)
-                pygame.display.flip()
-                time.sleep(1)
+        profiler.frame()
+        rt.poll()
+        profiler.mark('events')
+        frame_dt = rt.tick()
+        profiler.mark('tick')
+
+        for dt in ticker.steps(frame_dt):
+            elapsed = ticker.time
+            spawn_timer += dt
+            if spawn_timer >= spawn_interval:
+                spawn_timer = 0
+                spawn_interval = max(0.25, random.randint(RAND_MIN, RAND_MAX)/20.0) * BALANCE['spawn']
+                side = random.choice(['top','left','right','bottom'])
+                if side == 'top': sx = random.randint(20, WINDOW_W-20); sy = 80
+                elif side == 'bottom': sx = random.randint(20, WINDOW_W-20); sy = WINDOW_H-20
+                elif side == 'left': sx = 20; sy = random.randint(80, WINDOW_H-60)
+                else: sx = WINDOW_W-20; sy = random.randint(80, WINDOW_H-60)
+                typ = random.choice(['dust','fly','wind'])
+                r = 10 if typ in ('dust','fly') else 16
+                dx = (cat_x - sx) + random.uniform(-40,40)
+                dy = (cat_y - sy) + random.uniform(-40,40)
+                dist = max(1, math.hypot(dx,dy))
+                speed = random.randint(60, 180)
+                vx, vy = dx/dist*speed, dy/dist*speed
+                obstacles.spawn(sx, sy, vx, vy, r, OBSTACLE_TYPES.index(typ))
+            profiler.mark('spawn')
+            obstacles.update(dt)
+            obstacles.cull()
+            profiler.mark('movement')
+
+            mx, my = rt.mouse()
+            px, py = last_mouse or (mx, my)
+            last_mouse = (mx, my)
+            cx, cy = cat_x + CAT_SIZE/2, cat_y + CAT_SIZE/2
+            collision_grid.build_pool(obstacles, 'circle')
+            cleared = collision_grid.query_swept(px, py, mx, my, 4, obstacles.vx, obstacles.vy, dt)
+            cat_hits = collision_grid.query_circle(cx, cy, CAT_SIZE/2 - 4)
+            obstacles.remove_at(cleared)
+            if len(np.setdiff1d(cat_hits, cleared)): # 마우스로 지운 건 제외
+                draw_frame(sleeping=False)
+                hold(1)
                 return False
-        screen.fill(BG_COLORS[5])
-        draw_cat(screen, cat_x, cat_y, CAT_SIZE, sleeping=True)
-        for ob in obstacles:
-            color = DUST if ob['type']=='dust' else FLY if ob['type']=='fly' else WIND
-            pygame.draw.circle(screen, color, (int(ob['x']), int(ob['y'])), ob['r'])
-        draw_timer_bar(elapsed, gs.total_time)
-        draw_text(screen, f"남은시간: {max(0, int(gs.total_time - elapsed))}초", 20, 45, BLACK)
-        draw_text(screen, "마우스가 닿게 하여 장애물들을 제거하세요!", 20, WINDOW_H-40, color=BLACK)
-        pygame.display.flip()
-
-        if elapsed >= gs.total_time: return True
+            profiler.mark('collision')
+            if elapsed >= gs.total_time: return True
+        draw_frame(sleeping=True)
+
+def mission_content(day, seed, bake=True, size=None): # 미션 시작 전에 만들어 둘 수 있는 것 (시작 위치, 미로, 거리장, 미로 배경)
+    t = time.perf_counter()
+    rng = random.Random(seed) # 다른 스레드에서 돌아도 게임 전체 random은 건드리지 않음
+    content = {}
+    if day == 1: content['cat'] = (rng.randint(40, WINDOW_W-40-CAT_SIZE), rng.randint(100, WINDOW_H-160))
+    elif day == 3:
+        cols, rows = size or maze_size() # 재생할 때는 녹화 파일의 미로 크기
+        maze = generate_maze(cols, rows, seed=seed)
+        field = DistanceField(maze, (1,1))
+        content.update(maze=maze, field=field, goal=field.farthest())
+        if bake and not maze_scrolls(cols, rows): # 큰 미로는 청크로 그리므로 굽지 않음
+            layer = pygame.Surface((WINDOW_W, WINDOW_H)) # convert는 메인 스레드에서
+            layer.fill(BG_COLORS[3])
+            draw_maze_tiles(layer, maze, (WINDOW_W - cols*TILE)//2, (WINDOW_H - rows*TILE)//2)
+            content['layer'] = layer
+    elif day == 4:
+        content['player'] = (rng.randint(40, WINDOW_W-40-PLAYER_SIZE), rng.randint(120, WINDOW_H-120-PLAYER_SIZE))
+        content['cat'] = (rng.randint(40, WINDOW_W-40-CAT_SIZE), rng.randint(120, WINDOW_H-120-CAT_SIZE))
+    content['build_ms'] = (time.perf_counter() - t) * 1000
+    return content
+
+class Prefetcher: # 인트로/결과 화면을 보여주는 동안 다음 미션 내용을 다른 스레드에서 만듦
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = {} # 일차 -> (seed, Future)
+
+    def start(self, day):
+        if day in self.pending or day not in EMOTIONS: return
+        seed = random.randrange(2**32) # seed는 메인 스레드에서 정함
+        self.pending[day] = (seed, self.executor.submit(mission_content, day, seed))
+
+    def ready(self, day): # 인트로 화면이 이걸 보고 끝남 (메인 스레드는 기다리는 동안에도 이벤트 처리)
+        self.start(day)
+        return self.pending[day][1].done()
+
+    def take(self, day, waited=0.0): # 미션 시작할 때: (seed, 내용), waited는 인트로를 늘려서 기다린 시간(초)
+        self.start(day)
+        seed, future = self.pending.pop(day)
+        content = future.result() # ready() 뒤에 부르면 바로 돌아옴
+        print(f"[prefetch] day{day}: 만드는 데 {content['build_ms']:.1f} ms, 인트로 연장 {waited * 1000:.1f} ms")
+        return seed, content
+prefetcher = Prefetcher()
 
 def run_mission(day, mission_func):
+    prefetcher.start(day) # 결과 화면에서 이미 시작했으면 그대로 둠
     start_time = time.time()
+    color = BLACK if day == 4 or day == 5 else WHITE
+    background = make_background(BG_COLORS[day])
+    draw_text_center(background, f"Day {day}", 40, color=color)
+    draw_text_center(background, NARRATIVES[day], 90, color=color)
+    draw_text_center(background, "미션 시작...", 140, color=color)
+    draw_text(background, "조작: 방향키/WASD 또는 마우스(특정 미션)", 20, WINDOW_H-40, color=color)
+    renderer.set_background(background)
+    profiler.scene = f"day{day}_intro"
+    governor.begin(f"day{day}_intro")
 
     while True:
+        profiler.frame(idle=True)
         game_quit()
+        profiler.mark('events')
         
-        screen.fill(BG_COLORS[day])
-        draw_text_center(screen, f"Day {day}", 40, color=BLACK if day == 4 or day == 5 else WHITE)
-        draw_text_center(screen, NARRATIVES[day], 90, color=BLACK if day == 4 or day == 5 else WHITE)
-        draw_text_center(screen, "미션 시작...", 140, color=BLACK if day == 4 or day == 5 else WHITE)
-        draw_text(screen, "조작: 방향키/WASD 또는 마우스(특정 미션)", 20, WINDOW_H-40, color=BLACK if day == 4 or day == 5 else WHITE)
-        pygame.display.flip()
-        if time.time() - start_time > 2: break
-
-    result = mission_func()
+        renderer.present()
+        left = start_time + 2 - time.time()
+        if left <= 0 and prefetcher.ready(day): break # 2초가 지나도 미션 내용이 안 됐으면 인트로를 더 보여줌
+        governor.idle(left if left > 0 else 0.05)
+        profiler.mark('tick')
+
+    profiler.scene = f"day{day}"
+    governor.begin(f"day{day}")
+    seed, content = prefetcher.take(day, max(0.0, time.time() - start_time - 2))
+    random.seed(seed) # 게임 중 random도 같은 seed에서 시작 (녹화/재생/시뮬레이션과 같은 규칙)
+    result = record_mission(day, mission_func, seed, content) if "--record" in sys.argv else mission_func(content)
+    if collision_grid.queries:
+        print(collision_grid.report())
+        collision_grid.reset_stats()
+    if input_buffer.report():
+        print(input_buffer.report())
+        input_buffer.latencies.clear()
 
     if result: gs.emotions.append(EMOTIONS[day])
+    elif capture: capture.dump(f"day{day}_fail") # 실패 직전 화면
+    background = make_background(BG_COLORS[0])
+    if result:
+        draw_text_center(background, "미션 성공!", WINDOW_H//2 - 40)
+        draw_text_center(background, f"회복한 감정: {EMOTIONS[day]}", WINDOW_H//2 + 10)
+    else:
+        draw_text_center(background, "실패했습니다. 다시 시도하세요.", WINDOW_H//2)
+    renderer.set_background(background)
+    profiler.scene = f"day{day}_result"
+    governor.begin(f"day{day}_result")
+    prefetcher.start(day + 1 if result else day) # 다음(또는 다시 할) 미션
     end_show_start = time.time()
     while time.time() - end_show_start < 2:
+        profiler.frame(idle=True)
         game_quit()
+        profiler.mark('events')
 
-        if result:
-            screen.fill(BG_COLORS[0])
-            draw_text_center(screen, "미션 성공!", WINDOW_H//2 - 40)
-            draw_text_center(screen, f"회복한 감정: {EMOTIONS[day]}", WINDOW_H//2 + 10)
-        else:
-            screen.fill(BG_COLORS[0])
-            draw_text_center(screen, "실패했습니다. 다시 시도하세요.", WINDOW_H//2)
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present()
+        governor.idle(end_show_start + 2 - time.time())
+        profiler.mark('tick')
+    governor.end()
     return result
 
 
 
 # --------------- 화면 함수 ---------------
 def title_screen():
+    background = make_background(BG_COLORS[0])
+    draw_text_center(background, "고영희 키우기", 80)
+    draw_cat(background, WINDOW_W//2 - 32, 160, 64)
+    draw_text_center(background, "게임 시작 (스페이스 또는 마우스 클릭)", 360)
+    renderer.set_background(background)
+    governor.begin("title")
     while gs.show_title:
         game_quit()
 
-        screen.fill(BG_COLORS[0])
-        draw_text_center(screen, "고영희 키우기", 80)
-        draw_cat(screen, WINDOW_W//2 - 32, 160, 64)
-        draw_text_center(screen, "게임 시작 (스페이스 또는 마우스 클릭)", 360)
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present()
+        mark_first_frame()
+        governor.idle()
+    governor.end()
 
 def narration_screen():
+    background = make_background(BG_COLORS[0])
+    draw_text_center(background, "인생이 재미없다고 느끼면서 살아가는 주인공", 120)
+    draw_text_center(background, "고양이 한마리를 키우게 되는데...", 150)
+    draw_text_center(background, "그 이름은 고영희..!", 180)
+    draw_text_center(background, "5일동안 고영희가 일으키는 이벤트들에 대한 미션을 해결하고,", 240)
+    draw_text_center(background, "감정을 회복해보자!", 270)
+    draw_text_center(background, "계속하려면 스페이스 또는 마우스 클릭,", WINDOW_H - 150)
+    draw_text_center(background, "게임을 종료하려면 ECS키를 눌러주세요.", WINDOW_H - 120)
+    renderer.set_background(background)
+    governor.begin("narration")
+    prefetcher.start(1)
     while gs.show_narration:
         game_quit()
 
-        screen.fill(BG_COLORS[0])
-        draw_text_center(screen, "인생이 재미없다고 느끼면서 살아가는 주인공", 120)
-        draw_text_center(screen, "고양이 한마리를 키우게 되는데...", 150)
-        draw_text_center(screen, "그 이름은 고영희..!", 180)
-        draw_text_center(screen, "5일동안 고영희가 일으키는 이벤트들에 대한 미션을 해결하고,", 240)
-        draw_text_center(screen, "감정을 회복해보자!", 270)
-        draw_text_center(screen, "계속하려면 스페이스 또는 마우스 클릭,", WINDOW_H - 150)
-        draw_text_center(screen, "게임을 종료하려면 ECS키를 눌러주세요.", WINDOW_H - 120)
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present()
+        governor.idle()
+    governor.end()
 
 def ending_screen():
+    background = make_background(BG_COLORS[6])
+    draw_text_center(background, NARRATIVES[6], 60, BLACK)
+    draw_cat(background, WINDOW_W//2 - 32, 110, 64)
+    draw_text_center(background, "회복한 감정들:", 220, BLACK)
+    y = 260
+    for i, e in enumerate(gs.emotions):
+        draw_text_center(background, f"{i+1}. {e}", y+30*i, BLACK)
+    draw_text_center(background, "게임 종료 (ESC)", WINDOW_H - 60, BLACK)
+    renderer.set_background(background)
+    governor.begin("ending")
     while gs.show_end:
         game_quit()
 
-        screen.fill(BG_COLORS[6])
-        draw_text_center(screen, NARRATIVES[6], 60, BLACK)
-        draw_cat(screen, WINDOW_W//2 - 32, 110, 64)
-        draw_text_center(screen, "회복한 감정들:", 220, BLACK)
-        y = 260
-        for i, e in enumerate(gs.emotions):
-            draw_text_center(screen, f"{i+1}. {e}", y+30*i, BLACK)
-        draw_text_center(screen, "게임 종료 (ESC)", WINDOW_H - 60, BLACK)
-        pygame.display.flip()
+        renderer.present()
+        governor.idle()
 
 
 
@@ -649,5 +1884,429 @@ def main_loop():
 
 
 
+# --------------- 시뮬레이션 ---------------
+MISSIONS = {1: mission_day1, 2: mission_day2, 3: mission_day3, 4: mission_day4, 5: mission_day5}
+
+def steer(dx, dy, dead=4): # 방향 벡터 -> 누를 방향키
+    keys = set()
+    if dx < -dead: keys.add(pygame.K_LEFT)
+    elif dx > dead: keys.add(pygame.K_RIGHT)
+    if dy < -dead: keys.add(pygame.K_UP)
+    elif dy > dead: keys.add(pygame.K_DOWN)
+    return keys
+
+def bot_chase(sim): # 1일차: 고양이 쫓아가기
+    p, c = sim.state['player'], sim.state['cat']
+    sim.pressed = steer(c.x - p.x, c.y - p.y)
+
+def bot_sneak(sim): # 2일차: 문 쪽으로 가다가 소리가 크면 잠깐 멈춤
+    p, door = sim.state['player'], sim.state['door']
+    if sim.state['sound']() > 90: sim.pressed = set()
+    else: sim.pressed = steer(door.x + 8 - p.size - p.x, door.bottom - 8 - p.y)
+
+def bot_maze(sim): # 3일차: 고양이 쪽 거리장을 따라 한 칸씩
+    maze, goal = sim.state['maze'], sim.state['goal']
+    x, y = sim.state['pos']()
+    field = distance_field(maze, goal)
+    d = field.distance(x, y)
+    sim.pressed = set()
+    for key, nx, ny in ((pygame.K_LEFT, x-1, y), (pygame.K_RIGHT, x+1, y), (pygame.K_UP, x, y-1), (pygame.K_DOWN, x, y+1)):
+        if 0 <= nx < field.cols and 0 <= ny < field.rows and 0 <= field.distance(nx, ny) < d:
+            sim.pressed = {key}
+            break
+
+def bot_dodge(sim): # 4일차: 가까운 사료와 고양이에서 멀어지고 가운데 쪽으로
+    p, c, pool = sim.state['player'], sim.state['cat'], sim.state['obstacles']
+    px, py = p.x + p.size/2, p.y + p.size/2
+    fx = (WINDOW_W/2 - px) * 0.002
+    fy = (WINDOW_H/2 + 40 - py) * 0.002
+    n = pool.count
+    dx, dy = px - pool.x[:n], py - pool.y[:n]
+    d2 = dx*dx + dy*dy + 1
+    near = d2 < 120*120
+    fx += float((dx[near] / d2[near]).sum()) * 60
+    fy += float((dy[near] / d2[near]).sum()) * 60
+    cdx, cdy = px - c.x - c.size/2, py - c.y - c.size/2
+    cd2 = cdx*cdx + cdy*cdy + 1
+    if cd2 < 150*150: fx += cdx / cd2 * 120; fy += cdy / cd2 * 120
+    sim.pressed = steer(fx, fy, dead=0.05)
+
+def bot_guard(sim): # 5일차: 고양이에 제일 가까운 장애물로 마우스 이동
+    (cx, cy), pool = sim.state['cat'], sim.state['obstacles']
+    n = pool.count
+    if n == 0: sim.mouse_pos = (int(cx), int(cy)); return
+    dx, dy = pool.x[:n] - cx, pool.y[:n] - cy
+    i = int((dx*dx + dy*dy).argmin())
+    sim.mouse_pos = (int(pool.x[i]), int(pool.y[i]))
+
+BOTS = {1: bot_chase, 2: bot_sneak, 3: bot_maze, 4: bot_dodge, 5: bot_guard}
+
+def simulate(day, provider=None, seed=None, dt=1.0/FPS): # 미션 하나를 화면 없이 실행하고 결과 + 통계 반환
+    global rt
+    if seed is None: seed = random.randrange(2**32)
+    content = mission_content(day, seed, bake=False) # run_mission과 같은 순서: 내용을 만들고 random을 seed로 맞춤
+    random.seed(seed)
+    sim = Simulation(BOTS[day] if provider is None else provider, dt)
+    profiler.scene = f"day{day}_sim"
+    real = rt
+    rt = sim
+    t = time.perf_counter()
+    try: result = MISSIONS[day](content)
+    finally: rt = real
+    wall = time.perf_counter() - t
+    return {'day': day, 'result': result, 'frames': sim.frames, 'sim_time': round(sim.t, 3), 'outcome_time': round(sim.t - sim.held, 3),
+            'wall_time': round(wall, 4), 'fps': round(sim.frames / wall) if wall > 0 else 0}
+
+def run_headless():
+    seed = arg_value("--seed")
+    for day in MISSIONS:
+        print(json.dumps(simulate(day, seed=None if seed is None else int(seed) + day)))
+
+
+
+# --------------- 밸런스 스윕 ---------------
+SWEEP_GRID = { # 기본으로 돌려볼 조합
+    'rand': [(1, 5), (1, 3), (3, 8)],
+    'cat_speed': [0.8, 1.0, 1.2],
+    'spawn': [0.75, 1.0, 1.5],
+    'time': [0.8, 1.0, 1.2],
+}
+SWEEP_RESULTS = os.path.join(BASE_DIR, "sweep_results.json")
+
+def parse_grid(text): # "rand=1-5,3-8;cat_speed=0.8,1.2" -> SWEEP_GRID 형태
+    grid = {}
+    for part in text.split(";"):
+        name, values = part.split("=")
+        if name == 'rand': grid[name] = [tuple(int(v) for v in value.split("-")) for value in values.split(",")]
+        else: grid[name] = [float(v) for v in values.split(",")]
+    return grid
+
+def apply_balance(params): # 워커 프로세스 안에서 난이도 값 바꾸기
+    global RAND_MIN, RAND_MAX
+    RAND_MIN, RAND_MAX = params.get('rand', (1, 5))
+    for name in BALANCE: BALANCE[name] = params.get(name, 1.0)
+
+def sweep_batch(day, params, seeds): # 같은 조합으로 여러 판 (프로세스 하나가 묶음으로 처리)
+    apply_balance(params)
+    return day, params, [(r['result'], r['outcome_time']) for r in (simulate(day, seed=seed) for seed in seeds)] # hold(1)은 빼고 결과가 난 시각
+
+def sweep_summary(day, params, runs):
+    wins = [t for ok, t in runs if ok]
+    losses = [t for ok, t in runs if not ok]
+    mean = lambda values: round(sum(values) / len(values), 3) if values else None
+    return {'day': day, **{k: list(v) if isinstance(v, tuple) else v for k, v in params.items()}, 'runs': len(runs),
+            'win_rate': round(len(wins) / len(runs), 3), 'win_time': mean(wins), 'loss_time': mean(losses)}
+
+def run_sweep():
+    grid = parse_grid(arg_value("--grid")) if arg_value("--grid") else SWEEP_GRID
+    days = [int(d) for d in arg_value("--days", "1,2,3,4,5").split(",")]
+    runs = int(arg_value("--runs", 20))
+    batch = int(arg_value("--batch", 5))
+    workers = int(arg_value("--workers", os.cpu_count() or 1))
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    jobs = [(day, params) for day in days for params in combos]
+    base = int(arg_value("--seed", 1302))
+    tasks = []
+    for day, params in jobs: # 조합마다 독립된 시드 흐름 (다른 조합을 같이 돌려도 결과가 같게)
+        key = int(hashlib.sha256(json.dumps(params).encode()).hexdigest()[:8], 16)
+        seeds = [int(v) for v in np.random.SeedSequence(base, spawn_key=(day, key)).generate_state(runs)]
+        tasks += [(day, params, seeds[i:i+batch]) for i in range(0, runs, batch)]
+    print(f"[sweep] {len(jobs)}개 조합 x {runs}판, 작업 {len(tasks)}개, 프로세스 {workers}개")
+
+    t = time.perf_counter()
+    collected = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for day, params, results in pool.map(sweep_batch, *zip(*tasks)):
+            collected.setdefault((day, json.dumps(params)), (day, params, []))[2].extend(results)
+    summary = [sweep_summary(day, params, results) for day, params, results in collected.values()]
+    wall = time.perf_counter() - t
+
+    for row in sorted(summary, key=lambda r: (r['day'], r['win_rate'])):
+        print(json.dumps(row, ensure_ascii=False))
+    with open(arg_value("--sweep-out", SWEEP_RESULTS), "w", encoding="utf-8") as f:
+        json.dump({'runs': runs, 'grid': grid, 'wall_time': round(wall, 2), 'results': summary}, f, indent=2)
+    print(f"[sweep] {len(jobs) * runs}판 {wall:.1f}초")
+
+
+
+# --------------- 녹화 / 재생 ---------------
+REPLAY_DIR = os.path.join(BASE_DIR, "replays")
+REPLAY_MAGIC = b"GYHR"
+REPLAY_VERSION = 3 # 2: seed로 미션 내용도 만듦, 3: 미로 크기 기록
+REPLAY_HEADER = struct.Struct("<4sBBbIBBfffIII") # magic, 버전, 일차, 결과(-1: 모름), 시드, RAND_MIN, RAND_MAX, 난이도 배율 3개, 프레임 수, 미로 가로/세로 (미로가 없으면 0)
+REPLAY_FRAME = struct.Struct("<BHHf") # 방향키 비트, 마우스 x, y, dt -> 프레임당 9바이트
+
+class Recorder(RealTime): # 실제로 플레이하면서 프레임마다 입력 기록
+    def __init__(self, day, seed, maze=(0, 0)):
+        self.day = day
+        self.seed = seed
+        self.maze = maze # (가로, 세로), --maze-size 없이 재생해도 같은 미로가 나오게
+        self.log = bytearray()
+        self.frames = 0
+        self.keys = 0
+        self.mouse_pos = (0, 0)
+        self.t = 0.0 # 기록한 dt를 더한 시간 (재생 때 now()와 같은 값)
+
+    def tick(self): # 입력은 프레임 단위로 한 번만 읽음 (재생 때와 똑같이)
+        dt = super().tick()
+        self.keys = actions_mask(input_buffer.actions())
+        mx, my = pygame.mouse.get_pos()
+        self.mouse_pos = (min(max(mx, 0), 65535), min(max(my, 0), 65535))
+        frame = REPLAY_FRAME.pack(self.keys, *self.mouse_pos, dt)
+        self.log += frame
+        self.frames += 1
+        dt = REPLAY_FRAME.unpack(frame)[3] # float32로 줄인 dt를 게임에도 써야 재생 결과가 같음
+        self.t += dt
+        return dt
+
+    def idle(self, timeout): self.tick() # 기다리는 프레임도 기록해야 재생 때 프레임 수가 맞음
+    def now(self): return self.t
+    def actions(self): return mask_actions(self.keys)
+    def mouse(self): return self.mouse_pos
+
+    def save(self, path, result):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.day, -1 if result is None else int(result), self.seed,
+                                    RAND_MIN, RAND_MAX, BALANCE['cat_speed'], BALANCE['spawn'], BALANCE['time'], self.frames, *self.maze)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(self.log)
+
+class Replay(Simulation): # 녹화 파일의 입력을 그대로 다시 넣음
+    def __init__(self, path, speed=1.0, headless=True):
+        super().__init__()
+        self.headless = headless
+        self.speed = speed # 1: 원래 속도, 4: 4배속, 0: 최대 속도
+        with open(path, "rb") as f: self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = REPLAY_HEADER.unpack_from(self.mm)[:2] if len(self.mm) >= REPLAY_HEADER.size else (None, None)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION: raise ValueError(f"녹화 파일이 아니거나 버전이 다름: {path}")
+        _, _, self.day, self.result, self.seed, rand_min, rand_max, cat_speed, spawn, limit, count, cols, rows = REPLAY_HEADER.unpack_from(self.mm)
+        self.maze = (cols, rows) if cols else None
+        self.balance = {'rand': (rand_min, rand_max), 'cat_speed': cat_speed, 'spawn': spawn, 'time': limit}
+        frame = np.dtype([('keys', 'u1'), ('mx', '<u2'), ('my', '<u2'), ('dt', '<f4')]) # REPLAY_FRAME과 같은 배치
+        self.log = np.frombuffer(self.mm, frame, count=count, offset=REPLAY_HEADER.size) # 파일을 복사하지 않고 바로 읽음
+        self.keys = 0
+        self.overrun = 0 # 기록이 끝났는데도 미션이 안 끝난 프레임 수 (0이 아니면 재현 실패)
+
+    def poll(self):
+        if not self.headless: game_quit()
+
+    def tick(self):
+        if self.frames < len(self.log): self.keys, mx, my, dt = self.log[self.frames].item()
+        else: self.keys, (mx, my), dt = 0, self.mouse_pos, 1.0/FPS; self.overrun += 1
+        self.frames += 1
+        self.t += dt
+        self.mouse_pos = (mx, my)
+        if not self.headless and self.speed > 0: clock.tick(round(self.speed / dt))
+        return dt
+
+    def actions(self): return mask_actions(self.keys)
+    def watch(self, **state): pass
+
+def record_mission(day, mission, seed, content): # run_mission에서 --record일 때 사용 (seed는 미션 내용과 게임 중 random 모두에 쓰임)
+    global rt
+    recorder = Recorder(day, seed, content['maze'].shape[::-1] if 'maze' in content else (0, 0))
+    path = os.path.join(REPLAY_DIR, f"day{day}_{time.strftime('%Y%m%d_%H%M%S')}.rec")
+    real = rt
+    rt = recorder
+    result = None
+    try: result = mission(content)
+    finally: # ESC로 나가도 거기까지는 저장
+        rt = real
+        recorder.save(path, result)
+        print(f"[record] {path} ({recorder.frames}프레임, {REPLAY_HEADER.size + len(recorder.log)}바이트)")
+    return result
+
+def play_replay(path, speed=1.0, headless=True):
+    global rt
+    replay = Replay(path, speed, headless)
+    saved = (RAND_MIN, RAND_MAX, dict(BALANCE))
+    apply_balance(replay.balance)
+    content = mission_content(replay.day, replay.seed, bake=not headless, size=replay.maze)
+    random.seed(replay.seed)
+    profiler.scene = f"day{replay.day}_replay"
+    real = rt
+    rt = replay
+    t = time.perf_counter()
+    try: result = MISSIONS[replay.day](content)
+    finally:
+        rt = real
+        apply_balance({'rand': saved[:2], **saved[2]})
+    recorded = None if replay.result < 0 else bool(replay.result)
+    return {'day': replay.day, 'result': result, 'recorded': recorded,
+            'match': replay.overrun == 0 and replay.frames == len(replay.log) and recorded in (None, result),
+            'frames': replay.frames, 'recorded_frames': len(replay.log), 'wall_time': round(time.perf_counter() - t, 4)}
+
+def run_replay(): # --replay 파일 [--speed 4] [--headless]
+    print(json.dumps(play_replay(arg_value("--replay"), float(arg_value("--speed", 1.0)), "--headless" in sys.argv)))
+
+
+
+# --------------- 벤치마크 ---------------
+BENCH_RESULTS = os.path.join(BASE_DIR, "bench_results.json")
+BENCH_BASELINE = os.path.join(BASE_DIR, "bench_baseline.json")
+
+def measure(fn, number=1, repeat=5): # 여러 번 재서 가장 빠른 값 (1회당 ms)
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(number): fn()
+        best = min(best, (time.perf_counter() - t) * 1000 / number)
+    return best
+
+def check_mazes(sizes=((41, 17), (40, 18), (10, 10), (3, 3)), seed=1302): # 테두리가 막혀 있고 모든 방이 이어졌는지 (짝수 크기 포함)
+    for cols, rows in sizes:
+        for name in MAZE_ALGORITHMS:
+            maze = generate_maze(cols, rows, name, seed)
+            assert maze.shape == (rows, cols), (name, cols, rows)
+            assert maze[0].all() and maze[-1].all() and maze[:, 0].all() and maze[:, -1].all(), f"{name} {cols}x{rows}: 테두리가 뚫림"
+            rooms = DistanceField(maze, (1, 1)).dist.reshape(rows, cols)[1:rows-1:2, 1:cols-1:2]
+            assert (rooms >= 0).all(), f"{name} {cols}x{rows}: 못 가는 방이 있음"
+
+def bench_maze_gen(results, sizes=((41, 17), (201, 201), (1001, 1001), (2001, 2001)), seed=1302): # 미로 생성 + BFS
+    check_mazes()
+    for cols, rows in sizes:
+        for name in MAZE_ALGORITHMS:
+            results[f"maze_gen/{name}/{cols}x{rows}"] = measure(lambda: generate_maze(cols, rows, name, seed), repeat=3)
+        maze = generate_maze(cols, rows, seed=seed)
+        results[f"maze_bfs/{cols}x{rows}"] = measure(lambda: DistanceField(maze, (1,1)), repeat=3)
+
+def bench_obstacles(results, counts=(10, 100, 1000, 10000), seed=1302): # 4/5일차 장애물 한 프레임
+    rng = random.Random(seed)
+    player = pygame.Rect(WINDOW_W//2, WINDOW_H//2, PLAYER_SIZE, PLAYER_SIZE)
+    for n in counts:
+        def spawn():
+            pool = ObstaclePool()
+            for _ in range(n): pool.spawn(rng.uniform(0, WINDOW_W), rng.uniform(80, WINDOW_H), rng.uniform(-200, 200), rng.uniform(-200, 200), 14)
+            return pool
+        results[f"obstacles/spawn/{n}"] = measure(spawn, repeat=3)
+        pool = spawn()
+
+        def frame():
+            pool.update(1.0/FPS)
+            pool.cull()
+            collision_grid.build_pool(pool, 'rect')
+            collision_grid.query_rect(player)
+            pool.remove_at(collision_grid.query_rect(player.move(60, 0)))
+            while pool.count < n: pool.spawn(rng.uniform(0, WINDOW_W), rng.uniform(80, WINDOW_H), rng.uniform(-200, 200), rng.uniform(-200, 200), 14)
+        results[f"obstacles/frame/{n}"] = measure(frame, number=20)
+        collision_grid.build_pool(pool, 'circle')
+        results[f"obstacles/swept/{n}"] = measure(lambda: collision_grid.query_swept(0, 80, WINDOW_W, WINDOW_H, 4, pool.vx, pool.vy, 1.0/FPS), number=20)
+    collision_grid.reset_stats()
+
+def bench_draw(results, calls=1000): # 그리기 함수 1000번 (texture 백엔드면 모은 명령을 present까지 해야 실제로 그린 것)
+    prefix, flush = ("draw/texture", gpu.present) if gpu else ("draw", lambda: None)
+    results[f"{prefix}/cat"] = measure(lambda: ([draw_cat(screen, 100, 100, CAT_SIZE, flip=True) for _ in range(calls)], flush()))
+    results[f"{prefix}/player"] = measure(lambda: ([draw_player(screen, 100, 100, PLAYER_SIZE, 'left') for _ in range(calls)], flush()))
+    results[f"{prefix}/text"] = measure(lambda: ([draw_text(screen, "움직이는 고양이를 잡아보자!", 20, 20) for _ in range(calls)], flush()))
+    results[f"{prefix}/text_dynamic"] = measure(lambda: ([draw_text_dynamic(screen, f"남은시간: {i % 30}초", 20, 45) for i in range(calls)], flush()))
+
+def bench_maze_frame(results, frames=100): # 미로 한 프레임: 타일 전부 그리기 vs 구워둔 배경 vs 바뀐 곳만 복구
+    cols = (WINDOW_W // TILE) | 1
+    rows = ((WINDOW_H - 120) // TILE) | 1
+    maze = generate_maze(cols, rows, seed=1302)
+    offset_x = (WINDOW_W - cols*TILE)//2
+    offset_y = (WINDOW_H - rows*TILE)//2
+    layer = bake_maze(maze, offset_x, offset_y)
+    sprite = pygame.Rect(offset_x, offset_y, PLAYER_SIZE, PLAYER_SIZE)
+
+    def tiles():
+        screen.fill(BG_COLORS[3])
+        draw_maze_tiles(screen, maze, offset_x, offset_y)
+
+    def dirty(): # 스프라이트 두 개 자리만 복구하고 다시 그림
+        screen.blit(layer, sprite, sprite)
+        screen.blit(layer, sprite.move(TILE, 0), sprite.move(TILE, 0))
+        draw_player(screen, sprite.x, sprite.y, PLAYER_SIZE)
+        draw_cat(screen, sprite.x + TILE, sprite.y, CAT_SIZE)
+    if gpu is None: # screen에 그리는 Surface 경로 비교라 texture 백엔드에서는 명령만 쌓이므로 건너뜀
+        results["maze_frame/tiles"] = measure(tiles, number=frames)
+        results["maze_frame/baked"] = measure(lambda: screen.blit(layer, (0, 0)), number=frames)
+        results["maze_frame/dirty"] = measure(dirty, number=frames)
+
+    view = pygame.Surface((WINDOW_W, WINDOW_H))
+    for size in (41, 401, 2001): # 큰 미로: 카메라가 매 프레임 한 칸씩 움직여도 비용이 미로 크기와 상관없는지
+        chunks = MazeChunks(generate_maze(size, size, seed=1302))
+        world = size * TILE
+        path = [(camera_axis(i * TILE, world, WINDOW_W), camera_axis(i * TILE, world, WINDOW_H)) for i in range(frames)]
+        results[f"maze_frame/scroll/{size}x{size}"] = measure(lambda: [chunks.draw(view, x, y) for x, y in path]) / frames
+
+def bench_backend(results, frames=200, counts=(50, 500)): # 같은 장면(4/5일차 비슷하게)을 Surface 경로와 Texture 경로로 그려서 비교
+    global gpu
+    rng = random.Random(1302)
+    background = make_background(BG_COLORS[5])
+    for n in counts:
+        obstacles = [(rng.randint(0, WINDOW_W), rng.randint(80, WINDOW_H), rng.choice((10, 16)), rng.randrange(3)) for _ in range(n)]
+
+        def scene():
+            draw_timer_bar(3, 10)
+            for x, y, r, kind in obstacles: circle_to(screen, OBSTACLE_COLORS[kind], (x, y), r)
+            draw_player(screen, 300, 250, PLAYER_SIZE, 'left')
+            draw_cat(screen, 400, 250, CAT_SIZE, flip=True)
+            draw_text_dynamic(screen, f"남은시간: {n % 10}초", 20, 45, BLACK)
+
+        def surface_frame(): # 배경 복사 + 그리기 + flip
+            screen.blit(background, (0, 0))
+            scene()
+            pygame.display.flip()
+
+        def texture_frame(): # 명령 모으기 + present
+            scene()
+            gpu.present()
+        if gpu is None: results[f"backend/surface/{n}"] = measure(surface_frame, number=frames)
+        else: results[f"backend/texture/{n}"] = measure(texture_frame, number=frames)
+    if gpu is None and "--bench-texture" in sys.argv: # 창에 Renderer를 붙이면 되돌릴 수 없어서 마지막에 한 번 전환
+        gpu = TextureBackend(accelerated=0 if "--software" in sys.argv else -1)
+        gpu.set_background(background)
+        bench_backend(results, frames, counts)
+
+BENCHMARKS = {'maze': bench_maze_gen, 'obstacles': bench_obstacles, 'draw': bench_draw, 'maze_frame': bench_maze_frame,
+              'backend': bench_backend} # backend는 Texture로 바꿀 수 있으므로 마지막
+
+def compare_bench(results, baseline, threshold): # 기준보다 threshold 비율 이상 느려진 항목
+    regressions = []
+    for name, ms in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"[bench] {name:<32} {ms:10.4f} ms   (기준 없음)")
+            continue
+        ratio = ms / base if base > 0 else 1.0
+        flag = "  <-- 느려짐" if ratio > 1 + threshold else ""
+        print(f"[bench] {name:<32} {ms:10.4f} ms   기준 {base:10.4f} ms  x{ratio:.2f}{flag}")
+        if flag: regressions.append(name)
+    return regressions
+
+def run_bench():
+    only = arg_value("--bench-only") # 예: --bench-only maze
+    threshold = float(arg_value("--bench-threshold", 0.2))
+    baseline_path = arg_value("--bench-baseline", BENCH_BASELINE)
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only is None or only == name: bench(results)
+        if gpu: gpu.commands.clear(); gpu.last = [] # 남은 명령이 다음 묶음의 첫 present에 섞이지 않게
+    report = {'python': sys.version.split()[0], 'pygame': pygame.version.ver, 'numpy': np.__version__,
+              'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'results': results}
+    with open(arg_value("--bench-out", BENCH_RESULTS), "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    if "--bench-save-baseline" in sys.argv:
+        with open(baseline_path, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+        print(f"[bench] 기준 저장: {baseline_path}")
+    try:
+        with open(baseline_path, encoding="utf-8") as f: baseline = json.load(f)['results']
+    except (OSError, ValueError, KeyError): # 기준이 없으면 비교를 못 하니 만드는 법을 알려줌
+        baseline = {}
+        print(f"[bench] 기준 파일 없음: {baseline_path} (--bench-save-baseline 으로 이 컴퓨터 기준을 먼저 저장)")
+    regressions = compare_bench(results, baseline, threshold)
+    if regressions:
+        print(f"[bench] {len(regressions)}개 항목이 {threshold:.0%} 넘게 느려짐")
+        sys.exit(1)
+
+
+
 # --------------- 실행 ---------------
-main_loop()
\ No newline at end of file
+if __name__ == "__main__": # 스윕 워커 프로세스에서는 실행 안 함
+    if "--pack-atlas" in sys.argv: pack_atlas()
+    elif "--bench" in sys.argv: run_bench()
+    elif "--sweep" in sys.argv: run_sweep()
+    elif "--replay" in sys.argv: run_replay()
+    elif "--headless" in sys.argv: run_headless()
+    else: main_loop()